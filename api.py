@@ -1,29 +1,63 @@
-import uuid, os, requests, random, jwt, datetime
-from sqlalchemy import func, or_
+import os, uuid, random, datetime, click
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from psycopg2.errors import QueryCanceled
 from flask import Flask, jsonify, request, current_app, g
 from flask_cors import CORS
+from flask_migrate import Migrate
 from dotenv import load_dotenv
-from functools import lru_cache, wraps
-from flask_jwt_extended import jwt_required, get_jwt_identity, JWTManager, create_access_token
-from decimal import Decimal
-from models import db, Word, Morpheme, Company, Ownership, SharePrice, User
+from functools import wraps
+from flask_jwt_extended import JWTManager, create_access_token
 
 load_dotenv()
+
+from models import db, Word, Morpheme, Company, User, QueuedOrder
+from market import MAX_SIMULATION_DAYS, run_tick, run_simulation
+from history import START_DATE, RESOLUTIONS, price_history
+from profiling import init_profiling, routeMetrics, gauges
+from db_pool import engine_options, pool_stats, statement_timeout, init_statement_timeout, without_statement_timeout
+from serializers import OrjsonProvider, encode_word, encode_morpheme, encode_company, encode_stock, encode_user
+from http_cache import responseCache, cached_response
+from rollups import company_stats, rebuild_rollups, refresh_stats
+from price_storage import PRICE_RETENTION_DAYS, MIN_RETENTION_DAYS, PARTITION_DAYS, compact_prices, partition_prices
+from portfolio import latest_prices, recent_prices, company_holders, user_holdings, leaderboard, user_rank
+from quotes import get_quote, refresh_quotes, bump_market_version
+from search import search_lexicon
+from listing import list_response, is_plain_listing
+from eshakap import render, inline_script, cache_stats, ID_MODES, MAX_BATCH_SIZE
+from supabase_auth import auth_stats
+from auth import token_required, identity_claims, invalidate_user, userCache
+from orders import OrderError, MAX_ORDER_LEGS, parse_leg, execute_order, execute_orders
+from order_queue import enqueue, describe, run_worker
+from lexicon import WORD_FIELDS, MORPHEME_FIELDS, get_lexicon, lexicon_miss, lexiconStore, script_columns, render_lexicon_scripts
+
 app = Flask(__name__, instance_relative_config=True)
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options()
 app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "development-key")
 app.config["JWT_SECRET_KEY"] = app.config["SECRET_KEY"] 
 app.config["JWT_TOKEN_LOCATION"] = ["headers"]
 app.config["JWT_HEADER_NAME"] = "Authorization"
 app.config["JWT_HEADER_TYPE"] = "Bearer"
+app.config["LEXICON_SNAPSHOT"] = os.environ.get("LEXICON_SNAPSHOT", "0") == "1"
+app.config["LEXICON_CHECK_INTERVAL"] = float(os.environ.get("LEXICON_CHECK_INTERVAL", 5))
+app.config["ORDER_QUEUE"] = os.environ.get("ORDER_QUEUE", "0") == "1"
+app.config["HTTP_CACHE"] = os.environ.get("HTTP_CACHE", "1") == "1"
+app.config["HTTP_CACHE_MAX_AGE"] = int(os.environ.get("HTTP_CACHE_MAX_AGE", 0))
+app.config["DB_STATEMENT_TIMEOUT_MS"] = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 15000))
+app.config["HISTORY_STATEMENT_TIMEOUT_MS"] = int(os.environ.get("HISTORY_STATEMENT_TIMEOUT_MS", 3000))
+app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PROFILE_SAMPLE_RATE", 0.1))
+app.config["N_PLUS_ONE_THRESHOLD"] = int(os.environ.get("N_PLUS_ONE_THRESHOLD", 10))
+app.json = OrjsonProvider(app)
 CORS(app)
 jwt = JWTManager(app)
 db.init_app(app)
+migrate = Migrate(app, db)
+init_profiling(app)
+init_statement_timeout(app)
 
-SUPABASE_PROJECT_ID = "sblovettyyzfrvbiroiz"
-SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
-START_DATE = datetime.datetime(2025, 9, 1)
+MAX_LEADERBOARD_SIZE = 500
 
 filterPattern = {
     "0": [],
@@ -44,124 +78,30 @@ filterPattern = {
     "f": ["general", "special", "replaceable", "combination"]
 }
 
-def token_required(f):
+def cron_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = request.headers.get("Authorization")
-        if not token:
-            return {"error": "Token missing"}, 401
-
-        try:
-            decoded = jwt.decode(
-                token.split(" ")[1], 
-                current_app.config["SECRET_KEY"], 
-                algorithms=["HS256"]
-            )
-            g.user = User.query.get(decoded["id"])
-        except:
-            return {"error": "Invalid or expired token"}, 401
+        secret = os.environ.get("CRON_SECRET")
+        if not secret or request.headers.get("X-CRON-KEY") != secret:
+            return {"error": "Unauthorized"}, 403
 
         return f(*args, **kwargs)
-    return decorated
-
-def get_current_day():
-    latest_day = db.session.query(func.max(SharePrice.day)).scalar()
-    return latest_day or 0
-
-def pay_dividends():
-    with current_app.app_context():
-        companies = Company.query.all()
+    return without_statement_timeout(decorated)
 
-        for company in companies:
-            ownerships = Ownership.query.filter_by(company_id=company.id).all()
-            latest_price = Decimal(get_latest_price(company.id))
-            dividend_per_share = latest_price * company.dividends / 100.0
-
-            for own in ownerships:
-                user = User.query.get(own.user_id)
-                dividend_amount = own.shares_owned * dividend_per_share
-                user.balance += dividend_amount
-
-        db.session.commit()
-        print("Dividends paid.")
+def json_object():
+    data = request.get_json(silent=True)
+    if data is None:
+        if request.get_data():
+            return None
+        data = {}
+    return data if isinstance(data, dict) else None
 
 def update_share_prices():
-    with current_app.app_context():
-        companies = Company.query.all()
-
-        for company in companies:
-            latest = (
-                SharePrice.query
-                .filter_by(company_id=company.id)
-                .order_by(SharePrice.day.desc())
-                .first()
-            )
-
-            if not latest:
-                continue
-
-            new_day = latest.day + 1
-            last_price = float(latest.price)
-
-            change_factor = 1 + (random.randint(-285, 285) / (100.0 * 1000))
-            new_price = round(last_price * change_factor, 2)
-            new_entry = SharePrice(
-                company_id=company.id,
-                day=new_day,
-                price=new_price
-            )
-
-            db.session.add(new_entry)
-
-        db.session.commit()
-        print("Share prices updated.")
-        pay_dividends()
-
-def get_latest_two_prices(company_id):
-    prices = (
-        SharePrice.query
-            .filter_by(company_id=company_id)
-            .order_by(SharePrice.day.desc())
-            .limit(2)
-            .all()
-    )
-
-    if not prices:
-        return (0.0, 0.0)
-    if len(prices) == 1:
-        return (float(prices[0].price), 0.0)
-    return (float(prices[0].price), float(prices[1].price))
-
-def get_user_shares_balance(user_id):
-    ownerships = Ownership.query.filter_by(user_id=user_id).all()
-    inShares = 0
-    for own in ownerships:
-        company = Company.query.get(own.company_id)
-        latest_price = get_latest_price(company.id)
-        inShares += own.shares_owned * latest_price
-    
-    return inShares
-
-def get_player_holdings(player_id):
-    ownerships = Ownership.query.filter_by(user_id=player_id).all()
-    result = []
+    stats = run_tick()
+    print(f"Share prices updated: {stats['prices_inserted']} prices, dividends paid to {stats['holders_credited']} holders in {stats['timings_ms']['total']} ms.")
+    return stats
 
-    for own in ownerships:
-        company = Company.query.get(own.company_id)
-        latest_price_obj = SharePrice.query.filter_by(company_id=company.id).order_by(SharePrice.day.desc()).first()
-        latest_price = float(latest_price_obj.price) if latest_price_obj else 0
-
-        result.append({
-            "company": company.name,
-            "code": company.code,
-            "shares_owned": own.shares_owned,
-            "current_value": own.shares_owned * latest_price
-        })
-
-    return result
-
-def get_company_stocks(company):
-    ownerships = Ownership.query.filter_by(company_id=company.id).all()
+def get_company_stocks(company, ownerships, history):
     sharesData = [{"owner": "Lötinäç'rä Ägavam", "color": "#7E0CE2", "shares": company.gov_shares, "is_user": False}, {"owner": "Insiders", "color": "#FFC800", "shares": company.insider_shares, "is_user": False}]
     IPOShares = 0
     userShares = []
@@ -178,264 +118,280 @@ def get_company_stocks(company):
     sharesData.append({"owner": "IPO", "color": "#FFF", "shares": company.float_shares - IPOShares, "is_user": False})
     sharesData.extend(userShares)
 
-    history = SharePrice.query.filter_by(company_id=company.id).order_by(SharePrice.day.desc()).all()
     priceData = []
-    for h in history:
-        if len(priceData) >= 7:
-            break
-        
-        date = START_DATE + datetime.timedelta(days=h.day)
+    for day, price in history:
+        date = START_DATE + datetime.timedelta(days=day)
         priceData.append({
-            "day": h.day,
+            "day": day,
             "date": date.strftime("%d %b"),
-            "price": float(h.price)
+            "price": price
         })
-    
-    priceData = list(reversed(priceData))
+
     return sharesData, priceData
 
-@lru_cache(maxsize=128)
-def get_user_info(token):
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "apikey": SUPABASE_JWT_SECRET
-    }
-    response = requests.get(
-        f"https://{SUPABASE_PROJECT_ID}.supabase.co/auth/v1/user",
-        headers=headers
-    )
-    if response.status_code == 200:
-        return response.json()
-    return None
+@app.errorhandler(PoolTimeoutError)
+def database_busy(e):
+    db.session.rollback()
+    return jsonify({"error": "Database is busy, try again"}), 503
 
-def verify_token(authHeader):
-    if not authHeader or not authHeader.startswith("Bearer "):
-        return None
-    token = authHeader.split(" ")[1]
-    return get_user_info(token)
+@app.errorhandler(OperationalError)
+def database_error(e):
+    db.session.rollback()
+    if isinstance(e.orig, QueryCanceled):
+        return jsonify({"error": "Query took too long"}), 503
+    return jsonify({"error": "Database unavailable"}), 503
 
 @app.route("/")
 def home():
     return jsonify({"message": "Connected to Lutinex API"})
 
 @app.route("/names")
+@cached_response("lexicon")
 def get_names():
-    names = [name for (name,) in db.session.query(Word.word).all()]
-    return jsonify(names)
+    if is_plain_listing():
+        lexicon = get_lexicon()
+        if lexicon:
+            return jsonify([record.word for record in lexicon.words])
+
+    lexicon_miss()
+    return list_response(Word, ["word"], [], [Word.id], flat=True)
 
 @app.route("/names/morphemes")
+@cached_response("lexicon")
 def get_morpheme_names():
-    names = [name for (name,) in db.session.query(Morpheme.morpheme).all()]
-    return jsonify(names)
+    if is_plain_listing():
+        lexicon = get_lexicon()
+        if lexicon:
+            return jsonify([record.morpheme for record in lexicon.morphemes])
+
+    lexicon_miss()
+    return list_response(Morpheme, ["morpheme"], [], [Morpheme.id], flat=True)
 
 @app.route("/fetch")
+@cached_response("lexicon")
 def fetch_words():
     query = request.args.get("q", "").lower()
     filterKey = request.args.get("f", "")
-
-    wordsQuery = Word.query
+    withScript = request.args.get("script") == "1"
+
+    if not query and is_plain_listing():
+        lexicon = get_lexicon()
+        if lexicon:
+            words = lexicon.words
+            if filterKey in filterPattern:
+                allowedTypes = [t.lower() for t in filterPattern[filterKey]]
+                words = [record for record in words if record.type.lower() in allowedTypes]
+            return jsonify([record.to_dict(withScript) for record in words])
+
+    lexicon_miss()
+    conditions = []
+    ordering = [Word.id]
     if query:
-        wordsQuery = wordsQuery.filter(
-            or_(
-                func.lower(Word.word).like(f"%{query}%"),
-                func.cast(Word.meaning, db.Text).ilike(f"%{query}%")
-            )
-        )
+        condition, ordering = search_lexicon(Word, Word.word, query)
+        conditions.append(condition)
 
     if filterKey in filterPattern:
         allowedTypes = [t.lower() for t in filterPattern[filterKey]]
-        wordsQuery = wordsQuery.filter(func.lower(Word.type).in_(allowedTypes))
+        conditions.append(func.lower(Word.type).in_(allowedTypes))
 
-    words = wordsQuery.all()
-
-    result = [{
-            "id": str(word.id),
-            "word": word.word,
-            "meaning": word.meaning,
-            "type": word.type,
-            "phonetic": word.phonetic,
-            "combination": word.combination
-    } for word in words]
-
-    return jsonify(result)
+    return list_response(Word, WORD_FIELDS, conditions, ordering, script=script_columns(Word, Word.word) if withScript else None)
 
 @app.route("/fetch/morphemes")
+@cached_response("lexicon")
 def fetch_morphemes():
     query = request.args.get("q", "").lower()
+    withScript = request.args.get("script") == "1"
 
-    morphemesQuery = Morpheme.query
-    if query:
-        morphemesQuery = morphemesQuery.filter(
-            or_(
-                func.lower(Morpheme.morpheme).like(f"%{query}%"),
-                func.cast(Morpheme.meaning, db.Text).ilike(f"%{query}%")
-            )
-        )
+    if not query and is_plain_listing():
+        lexicon = get_lexicon()
+        if lexicon:
+            return jsonify([record.to_dict(withScript) for record in lexicon.morphemes])
 
-    morphemes = morphemesQuery.all()
+    lexicon_miss()
+    conditions = []
+    ordering = [Morpheme.id]
+    if query:
+        condition, ordering = search_lexicon(Morpheme, Morpheme.morpheme, query)
+        conditions.append(condition)
 
-    result = [{
-            "id": str(morpheme.id),
-            "morpheme": morpheme.morpheme,
-            "meaning": morpheme.meaning,
-            "type": morpheme.type,
-            "phonetic": morpheme.phonetic,
-            "changes": morpheme.changes
-    } for morpheme in morphemes]
-    return jsonify(result)
+    return list_response(Morpheme, MORPHEME_FIELDS, conditions, ordering, script=script_columns(Morpheme, Morpheme.morpheme) if withScript else None)
 
 @app.route("/word")
+@cached_response("lexicon")
 def get_word():
     query = request.args.get("q", "").lower()
+    withScript = request.args.get("script") == "1"
     if not query:
         return jsonify([])
 
+    lexicon = get_lexicon()
+    if lexicon:
+        return jsonify([record.to_dict(withScript) for record in lexicon.words_by_form.get(query, [])])
+
     words = Word.query.filter(func.lower(Word.word) == query).all()
-    result = [{
-        "id": str(word.id),
-        "word": word.word,
-        "meaning": word.meaning,
-        "type": word.type,
-        "phonetic": word.phonetic,
-        "combination": word.combination
-    } for word in words]
+    result = [encode_word(word) for word in words]
+
+    if withScript:
+        for entry, word in zip(result, words):
+            entry["script"] = inline_script(word.script if word.script_source == query else None, word.word)
     
     return jsonify(result)
 
 @app.route("/word/morpheme")
+@cached_response("lexicon")
 def get_morpheme():
     query = request.args.get("q", "").lower()
+    withScript = request.args.get("script") == "1"
     if not query:
         return jsonify([])
 
+    lexicon = get_lexicon()
+    if lexicon:
+        return jsonify([record.to_dict(withScript) for record in lexicon.morphemes_by_form.get(query, [])])
+
     morphemes = Morpheme.query.filter(func.lower(Morpheme.morpheme) == query).all()
-    result = [{
-        "id": str(morpheme.id),
-        "morpheme": morpheme.morpheme,
-        "meaning": morpheme.meaning,
-        "type": morpheme.type,
-        "phonetic": morpheme.phonetic,
-        "changes": morpheme.changes
-    } for morpheme in morphemes]
+    result = [encode_morpheme(morpheme) for morpheme in morphemes]
+
+    if withScript:
+        for entry, morpheme in zip(result, morphemes):
+            entry["script"] = inline_script(morpheme.script if morpheme.script_source == query else None, morpheme.morpheme)
 
     return jsonify(result)
 
 @app.route("/max")
+@cached_response("lexicon")
 def get_all_words_count():
+    lexicon = get_lexicon()
+    if lexicon:
+        return jsonify({"max": len(lexicon.words)})
+
     maxCount = db.session.query(func.count(Word.id)).scalar()
     return jsonify({"max": maxCount})
 
 @app.route("/max/morpheme")
+@cached_response("lexicon")
 def get_all_morphemes_count():
+    lexicon = get_lexicon()
+    if lexicon:
+        return jsonify({"max": len(lexicon.morphemes)})
+
     maxCount = db.session.query(func.count(Morpheme.id)).scalar()
     return jsonify({"max": maxCount})
 
+@app.route("/metrics/lexicon")
+def lexicon_metrics():
+    return jsonify(lexiconStore.stats())
+
+@app.route("/metrics/auth")
+def auth_metrics():
+    return jsonify({**auth_stats(), "user_cache": userCache.stats()})
+
+@app.route("/metrics/http-cache")
+def http_cache_metrics():
+    return jsonify(responseCache.stats())
+
+@app.route("/metrics")
+def prometheus_metrics():
+    lines = routeMetrics.prometheus() + gauges("lutinex_db_pool", pool_stats()) + gauges("lutinex_http_cache", responseCache.stats())
+    return current_app.response_class("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+@app.route("/metrics/pool")
+def pool_metrics():
+    return jsonify(pool_stats())
+
+@app.route("/metrics/convert")
+def convert_metrics():
+    return jsonify(cache_stats())
+
 @app.route("/convert")
 def convert_to_script():
     query = request.args.get("q", "").lower()
-    characters = list(query)
-    charPath = "https://zhyov.github.io/Lutinex/assets/char/"
-    consonants = ["p", "b", "f", "v", "w", "k", "g", "t", "d", "đ", "z", "ž", "h", "j", "l", "m", "n", "ň", "r", "s", "š", "c", "č", "ç"]
-    vowels = ["a", "ä", "ą", "i", "į", "o", "ö"]
-    eshakap = []
-    final = []
-    i = 0
-
-    while i < len(characters):
-        char = characters[i]
-        prev = characters[i - 1] if i > 0 else None
-        next = characters[i + 1] if i + 1 < len(characters) else None
-
-        if char in vowels and (prev not in consonants):
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}aläp.svg" })
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}{char}.svg" })
-        elif char in consonants and (next is None or next in consonants):
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}{char}.svg" })
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}∅.svg" })
-        elif char in consonants and next in vowels:
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}{char}.svg" })
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}{next}.svg" })
-            i += 1
-        else:
-            final.append({ "id": str(uuid.uuid4()), "path": f"{charPath}{char}.svg" })
-
-        if len(final) == 2:
-            eshakap.append({ "id": str(uuid.uuid4()), "syllable": final })
-            final = []
-
-        i += 1
-    
-    if len(final) > 0:
-        eshakap.append({ "id": f"{str(uuid.uuid4())}", "syllable": final })
-
-    return jsonify(eshakap)
+    ids = request.args.get("ids", "uuid")
+    if ids not in ID_MODES:
+        return jsonify({"error": "Invalid ids mode"}), 400
+
+    return jsonify(render(query, ids))
+
+@app.route("/convert/batch", methods=["POST"])
+def convert_batch():
+    data = request.get_json(silent=True)
+    if isinstance(data, list):
+        data = {"q": data}
+    if not isinstance(data, dict) or not isinstance(data.get("q"), list):
+        return {"error": "Expected a JSON list of strings, or an object with a list of strings in 'q'"}, 400
+
+    queries = data["q"]
+    ids = data.get("ids", "uuid")
+    if len(queries) > MAX_BATCH_SIZE:
+        return {"error": f"At most {MAX_BATCH_SIZE} strings per batch"}, 400
+    if ids not in ID_MODES:
+        return {"error": "Invalid ids mode"}, 400
+    if not all(isinstance(q, str) for q in queries):
+        return {"error": "Every entry in 'q' must be a string"}, 400
+
+    return jsonify([render(q.lower(), ids) for q in queries])
 
 @app.route("/order")
+@cached_response("static")
 def script_order():
     order = ["a", "ä", "ą", "p", "b", "f", "v", "w", "k", "g", "t", "d", "đ", "z", "ž", "i", "į", "h", "j", "l", "m", "n", "ň", "o", "ö", "r", "s", "š", "c", "č", "ç"]
 
     return jsonify(order)
 
 @app.route("/order/levotin")
+@cached_response("static")
 def levotin_script_order():
     order = ["α", "β", "γ", "δ", "ε", "η", "ι", "κ", "λ", "μ", "ν", "ο", "π", "ρ", "σ", "ς", "τ", "υ", "φ", "χ", "ω"]
 
     return jsonify(order)
 
-def get_latest_price(company_id):
-    latest = (
-        SharePrice.query.filter_by(company_id=company_id)
-        .order_by(SharePrice.day.desc())
-        .first()
-    )
-    return float(latest.price) if latest else 0.0
-
 @app.route("/companies")
+@cached_response("market")
 def get_companies():
     companies = Company.query.all()
+    stats = company_stats()
     result = []
     for company in companies:
-        latest_price, prev_price = get_latest_two_prices(company.id)
+        latest_price, prev_price = get_quote(company.id)[:2]
         change = latest_price - prev_price
         percent_change = (change / prev_price * 100) if prev_price > 0 else 0
 
         result.append({
-            "id": str(company.id),
-            "name": company.name,
-            "code": company.code,
+            **encode_company(company),
             "latest_price": latest_price,
             "previous_price": prev_price,
             "change": change,
             "percent_change": percent_change,
-            "total_shares": company.total_shares,
-            "dividends": company.dividends
+            "stats": stats.get(str(company.id))
         })
     
     return jsonify(result)
 
 @app.route("/company/<company_id>")
+@cached_response("market")
 def get_company(company_id):
     company = Company.query.get(company_id)
     if not company:
         return jsonify({"error": "Company not found"}), 404
 
-    latest_price, prev_price = get_latest_two_prices(company.id)
+    latest_price, prev_price = get_quote(company.id)[:2]
     change = latest_price - prev_price
     percent_change = round((change / prev_price * 100), 2) if prev_price > 0 else 0
 
     companyInfo = {
-        "id": str(company.id),
-        "name": company.name,
-        "code": company.code,
+        **encode_company(company),
         "price": latest_price,
         "previous_price": prev_price,
         "change": change,
         "percent_change": percent_change,
-        "total_shares": company.total_shares,
-        "dividends": company.dividends
+        "stats": company_stats([company.id]).get(str(company.id))
     }
 
-    sharesData, priceData = get_company_stocks(company)
+    sharesData, priceData = get_company_stocks(
+        company,
+        company_holders([company.id]).get(str(company.id), []),
+        [(day, float(price)) for day, price in reversed(db.session.execute(latest_prices(7, company.id)).all())]
+    )
 
     result = {
         "company": companyInfo,
@@ -446,73 +402,102 @@ def get_company(company_id):
     return jsonify(result)
 
 @app.route("/company/<company_id>/history")
+@cached_response("market")
+@statement_timeout("HISTORY_STATEMENT_TIMEOUT_MS")
 def get_company_history(company_id):
-    history = SharePrice.query.filter_by(company_id=company_id).order_by(SharePrice.day).all()
-    result = [
-        {"day": h.day, "price": float(h.price)}
-        for h in history
-    ]
+    try:
+        companyId = uuid.UUID(company_id)
+    except ValueError:
+        return jsonify({"error": "Company not found"}), 404
 
-    return jsonify(result)
+    resolution = request.args.get("resolution", "daily")
+    if resolution not in RESOLUTIONS:
+        return jsonify({"error": f"Resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+
+    start = request.args.get("from", type=int)
+    end = request.args.get("to", type=int)
+    if ("from" in request.args and start is None) or ("to" in request.args and end is None):
+        return jsonify({"error": "Invalid day range"}), 400
+
+    return jsonify(price_history(companyId, resolution, start, end))
 
 @app.route("/user/<player_username>")
+@cached_response("market")
 def get_user_by_username(player_username):
     user = User.query.filter(User.username == player_username).first()
     if not user:
         return jsonify({"error": "User not found"}), 404
 
+    holdings = user_holdings(user.id)
     result = {
-        "id": str(user.id),
-        "username": user.username,
-        "name": user.name,
-        "color": user.color,
-        "own_company": user.own_company,
-        "balance": float(user.balance),
-        "in_shares": get_user_shares_balance(user.id),
-        "stocks": get_player_holdings(user.id)
+        **encode_user(user),
+        "in_shares": sum(h["current_value"] for h in holdings),
+        "stocks": holdings
     }
 
     return jsonify(result)
 
 @app.route("/users")
+@cached_response("market")
 def get_users():
     users = User.query.all()
     result = []
     for user in users:
-        result.append({
-            "id": str(user.id),
+        result.append({**encode_user(user), "in_shares": user.in_shares})
+
+    return jsonify(result)
+
+@app.route("/leaderboard")
+@cached_response("market")
+def get_leaderboard():
+    try:
+        limit = int(request.args.get("limit", 50))
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+    if limit <= 0 or offset < 0:
+        return jsonify({"error": "Invalid limit or offset"}), 400
+
+    result = {"entries": leaderboard(min(limit, MAX_LEADERBOARD_SIZE), offset)}
+    username = request.args.get("user")
+    if username:
+        user = User.query.filter(User.username == username).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        result["user"] = {
             "username": user.username,
-            "name": user.name,
-            "color": user.color,
-            "own_company": user.own_company,
-            "balance": float(user.balance),
-            "in_shares": get_user_shares_balance(user.id)
-        })
+            "rank": user_rank(user),
+            "net_worth": user.balance + user.in_shares
+        }
 
     return jsonify(result)
 
 @app.route("/stocks")
+@cached_response("market")
 def get_stocks():
     companies = Company.query.all()
+    holders = company_holders()
+    history = recent_prices(7)
     result = []
 
     for company in companies:
-        latest_price, prev_price = get_latest_two_prices(company.id)
+        latest_price, prev_price = get_quote(company.id)[:2]
         change = latest_price - prev_price
         percent_change = (change / prev_price * 100) if prev_price > 0 else 0
 
         companyInfo = {
-            "id": str(company.id),
-            "name": company.name,
-            "code": company.code,
+            **encode_stock(company),
             "price": latest_price,
             "previous_price": prev_price,
             "change": change,
-            "percent_change": percent_change,
-            "total_shares": company.total_shares
+            "percent_change": percent_change
         }
 
-        sharesData, priceData = get_company_stocks(company)
+        sharesData, priceData = get_company_stocks(
+            company,
+            holders.get(str(company.id), []),
+            history.get(str(company.id), [])
+        )
 
         result.append({
             "company": companyInfo,
@@ -545,6 +530,7 @@ def register():
     user.set_password(data["password"])
     db.session.add(user)
     db.session.commit()
+    bump_market_version()
 
     return {"message": "User registered successfully"}, 201
 
@@ -559,137 +545,215 @@ def login():
     if not user.check_password(data["password"]):
         return {"error": "Invalid password"}, 401
 
-    token = create_access_token(identity=str(user.id), expires_delta=datetime.timedelta(hours=24))
+    token = create_access_token(
+        identity=str(user.id),
+        additional_claims=identity_claims(user),
+        expires_delta=datetime.timedelta(hours=24)
+    )
 
     return {
         "token": token,
-        "user": {
-            "id": str(user.id),
-            "username": user.username,
-            "name": user.name,
-            "color": user.color,
-            "balance": float(user.balance),
-            "own_company": user.own_company
-        }
+        "user": encode_user(user)
     }
 
 @app.route("/stock-update", methods=["POST"])
+@cron_required
 def trigger_update_prices():
-    auth = request.headers.get("X-CRON-KEY")
-    if auth != os.environ.get("CRON_SECRET"):
-        return {"error": "Unauthorized"}, 403
-    
-    update_share_prices()
-    return {"message": "Share prices updated successfully"}
+    stats = update_share_prices()
+    return {"message": "Share prices updated successfully", "stats": stats}
+
+@app.route("/admin/simulate", methods=["POST"])
+@cron_required
+def trigger_simulation():
+    data = json_object()
+    if data is None:
+        return {"error": "Expected a JSON object"}, 400
+    try:
+        days = int(data.get("days", request.args.get("days", 1)))
+        seed = data.get("seed", request.args.get("seed"))
+        seed = int(seed) if seed is not None else None
+    except (TypeError, ValueError):
+        return {"error": "Invalid days or seed"}, 400
+    if days <= 0 or days > MAX_SIMULATION_DAYS:
+        return {"error": f"Days must be between 1 and {MAX_SIMULATION_DAYS}"}, 400
+
+    stats = run_simulation(days, seed)
+    return {"message": f"Simulated {days} days of share prices", "stats": stats}
+
+@app.route("/admin/compact-prices", methods=["POST"])
+@cron_required
+def trigger_price_compaction():
+    data = json_object()
+    if data is None:
+        return {"error": "Expected a JSON object"}, 400
+    try:
+        retention = int(data.get("retention_days", request.args.get("retention_days", PRICE_RETENTION_DAYS)))
+    except (TypeError, ValueError):
+        return {"error": "Invalid retention_days"}, 400
+    if retention < MIN_RETENTION_DAYS:
+        return {"error": f"Retention must be at least {MIN_RETENTION_DAYS} days"}, 400
+
+    stats = compact_prices(retention)
+    return {"message": f"Compacted share prices older than day {stats['cutoff_day']}", "stats": stats}
+
+@app.route("/admin/render-script", methods=["POST"])
+@cron_required
+def trigger_render_script():
+    stats = render_lexicon_scripts(full=request.args.get("full") == "1")
+    return {"message": "Lexicon script rendered", "stats": stats}
+
+@app.route("/auth/me")
+@token_required
+def get_current_user():
+    return {"user": g.user.to_dict()}
+
+def queue_orders(legs):
+    try:
+        parsed = [parse_leg(leg, i) for i, leg in enumerate(legs)]
+    except OrderError as e:
+        return {"error": e.message, "leg": e.leg}, e.status
+
+    order = enqueue(g.user.id, parsed)
+    return {"message": "Order queued", "order_id": str(order.id), "status": order.status}, 202
 
 @app.route("/stocks/buy", methods=["POST"])
-@jwt_required()
+@token_required
 def buy_shares():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return {"error": "User not found"}, 404
-
-    data = request.json
-    company_id = data.get("company_id")
-    shares_to_buy = int(data.get("shares", 0))
-
-    if shares_to_buy <= 0:
-        return {"error": "Invalid number of shares"}, 400
-
-    company = Company.query.get(company_id)
-    if not company:
-        return {"error": "Company not found"}, 404
-
-    latest_price = get_latest_price(company.id)
-    total_cost = latest_price * shares_to_buy
+    data = json_object()
+    if data is None:
+        return {"error": "Expected a JSON object"}, 400
+    if current_app.config["ORDER_QUEUE"]:
+        return queue_orders([{**data, "side": "buy"}])
 
-    if user.balance < total_cost:
-        return {"error": "Insufficient balance"}, 400
+    try:
+        result = execute_order(g.user.id, "buy", data.get("company_id"), data.get("shares", 0))
+    except OrderError as e:
+        return {"error": e.message}, e.status
+    finally:
+        invalidate_user(g.user.id)
 
-    user.balance -= Decimal(total_cost)
-
-    ownership = Ownership.query.filter_by(user_id=user.id, company_id=company.id).first()
-    if ownership:
-        ownership.shares_owned += shares_to_buy
-    else:
-        ownership = Ownership(
-            company_id=company.id,
-            user_id=user.id,
-            day=get_current_day(),
-            shares_owned=shares_to_buy
-        )
-        db.session.add(ownership)
-
-    db.session.commit()
-    return {"message": f"Bought {shares_to_buy} shares of {company.name}", "balance": float(user.balance)}
+    return {"message": f"Bought {int(data['shares'])} shares of {result['company']}", "balance": result["balance"]}
 
 @app.route("/stocks/sell", methods=["POST"])
-@jwt_required()
+@token_required
 def sell_shares():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return {"error": "User not found"}, 404
-
-    data = request.json
-    company_id = data.get("company_id")
-    shares_to_sell = int(data.get("shares", 0))
-
-    if shares_to_sell <= 0:
-        return {"error": "Invalid number of shares"}, 400
-
-    company = Company.query.get(company_id)
-    if not company:
-        return {"error": "Company not found"}, 404
-
-    ownership = Ownership.query.filter_by(user_id=user.id, company_id=company.id).first()
-    if not ownership or ownership.shares_owned < shares_to_sell:
-        return {"error": "Not enough shares to sell"}, 400
-
-    latest_price = get_latest_price(company.id)
-    total_value = latest_price * shares_to_sell
-
-    user.balance += Decimal(total_value)
-    ownership.shares_owned -= Decimal(shares_to_sell)
-
-    if ownership.shares_owned == 0:
-        db.session.delete(ownership)
-
-    db.session.commit()
-    return {"message": f"Sold {shares_to_sell} shares of {company.name}", "balance": float(user.balance)}
+    data = json_object()
+    if data is None:
+        return {"error": "Expected a JSON object"}, 400
+    if current_app.config["ORDER_QUEUE"]:
+        return queue_orders([{**data, "side": "sell"}])
+
+    try:
+        result = execute_order(g.user.id, "sell", data.get("company_id"), data.get("shares", 0))
+    except OrderError as e:
+        return {"error": e.message}, e.status
+    finally:
+        invalidate_user(g.user.id)
+
+    return {"message": f"Sold {int(data['shares'])} shares of {result['company']}", "balance": result["balance"]}
+
+@app.route("/stocks/orders", methods=["POST"])
+@token_required
+def place_orders():
+    data = json_object()
+    if data is None:
+        return {"error": "Expected a JSON object"}, 400
+    legs = data.get("orders")
+    if not isinstance(legs, list) or not legs:
+        return {"error": "Expected a non-empty list of orders"}, 400
+    if len(legs) > MAX_ORDER_LEGS:
+        return {"error": f"At most {MAX_ORDER_LEGS} orders per request"}, 400
+    if current_app.config["ORDER_QUEUE"]:
+        return queue_orders(legs)
+
+    try:
+        execution = execute_orders(g.user.id, [parse_leg(leg, i) for i, leg in enumerate(legs)])
+    except OrderError as e:
+        return {"error": e.message, "leg": e.leg}, e.status
+    finally:
+        invalidate_user(g.user.id)
+
+    return {"message": f"Executed {len(legs)} orders", **execution}
+
+@app.route("/stocks/orders/<order_id>")
+@token_required
+def get_queued_order(order_id):
+    try:
+        order = db.session.get(QueuedOrder, uuid.UUID(order_id))
+    except ValueError:
+        order = None
+    if not order or str(order.user_id) != g.user.id:
+        return {"error": "Order not found"}, 404
+
+    return describe(order)
 
 @app.route("/auth/update", methods=["PATCH"])
-@jwt_required()
+@token_required
 def update_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return {"error": "User not found"}, 404
-
     data = request.json
-
-    if "name" in data:
-        user.name = data["name"]
-    if "color" in data:
-        user.color = data["color"]
-    if "own_company" in data:
-        user.own_company = data["own_company"]
-
+    changes = {field: data[field] for field in ("name", "color", "own_company") if field in data}
+
+    user = db.session.execute(
+        update(User)
+        .where(User.id == g.user.id)
+        .values(**changes, version=User.version + 1)
+        .returning(User.id, User.username, User.name, User.color, User.own_company, User.balance)
+    ).one()
     db.session.commit()
+    invalidate_user(user.id)
+    bump_market_version()
 
     return {
         "message": "User updated successfully",
-        "user": {
-            "id": str(user.id),
-            "username": user.username,
-            "name": user.name,
-            "color": user.color,
-            "own_company": user.own_company,
-            "balance": float(user.balance)
-        }
+        "user": encode_user(user)
     }
 
+@app.cli.command("render-script")
+@click.option("--full", is_flag=True, help="Re-render every row, not only rows whose text changed.")
+def render_script_command(full):
+    stats = render_lexicon_scripts(full)
+    print(f"Rendered script for {stats['words']} words and {stats['morphemes']} morphemes in {stats['seconds']} s.")
+
+@app.cli.command("simulate")
+@click.option("--days", default=1, show_default=True, type=click.IntRange(1, MAX_SIMULATION_DAYS), help="Days of prices to generate.")
+@click.option("--seed", default=None, type=int, help="Random seed for a reproducible run.")
+def simulate_command(days, seed):
+    stats = run_simulation(days, seed)
+    print(f"Simulated {stats['days']} days for {stats['companies']} companies: {stats['prices_inserted']} prices, dividends paid to {stats['holders_credited']} holders in {stats['timings_ms']['total']} ms.")
+
+@app.cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    rollups = rebuild_rollups()
+    stats = refresh_stats()
+    db.session.commit()
+    bump_market_version()
+    print(f"Rebuilt {rollups} price rollups and statistics for {stats} companies.")
+
+@app.cli.command("compact-prices")
+@click.option("--retention-days", default=PRICE_RETENTION_DAYS, show_default=True, type=click.IntRange(MIN_RETENTION_DAYS), help="Days of daily prices to keep; older weeks are kept as weekly rollups only.")
+def compact_prices_command(retention_days):
+    stats = compact_prices(retention_days)
+    print(f"Compacted prices before day {stats['cutoff_day']}: {stats['prices_deleted']} rows deleted, {stats['partitions_dropped']} partitions dropped, {stats['rollups']} rollups merged.")
+
+@app.cli.command("partition-prices")
+@click.option("--days", default=PARTITION_DAYS, show_default=True, type=click.IntRange(7), help="Days per partition, a multiple of 7.")
+def partition_prices_command(days):
+    if days % 7:
+        raise click.BadParameter("must be a multiple of 7", param_hint="--days")
+    created = partition_prices(days)
+    print(f"Partitioned share_prices into {created} ranges of {days} days." if created else "share_prices is already partitioned.")
+
+@app.cli.command("order-worker")
+@click.option("--batch", default=200, show_default=True, help="Orders applied per transaction.")
+@click.option("--interval", default=0.2, show_default=True, help="Seconds to sleep when the queue is empty.")
+@click.option("--once", is_flag=True, help="Drain the queue and exit.")
+def order_worker_command(batch, interval, once):
+    run_worker(batch, interval, once)
+
+@app.cli.command("refresh-quotes")
+def refresh_quotes_command():
+    print(f"Refreshed quotes for {refresh_quotes()} companies.")
+
 if __name__ == "__main__":
     if os.environ.get("FLASK_ENV") == "development":
         with app.app_context():
@@ -0,0 +1,81 @@
+import os, uuid
+from functools import wraps
+from flask import g, request
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
+from sqlalchemy import select
+from models import db, User
+from cache import TTLCache
+from supabase_auth import is_supabase_token, verify_token
+
+USER_FIELDS = ["id", "username", "name", "color", "own_company", "balance", "version"]
+
+userCache = TTLCache(
+    maxsize=int(os.environ.get("USER_CACHE_SIZE", 2048)),
+    ttl=float(os.environ.get("USER_CACHE_TTL", 10))
+)
+
+class CachedUser:
+    __slots__ = USER_FIELDS
+
+    def __init__(self, values):
+        for field, value in zip(USER_FIELDS, values):
+            setattr(self, field, value)
+        self.id = str(self.id)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "name": self.name,
+            "color": self.color,
+            "own_company": self.own_company,
+            "balance": float(self.balance)
+        }
+
+def identity_claims(user):
+    return {"username": user.username, "ver": user.version}
+
+def load_user(user_id):
+    row = db.session.execute(
+        select(*[getattr(User, f) for f in USER_FIELDS]).where(User.id == user_id)
+    ).first()
+    return CachedUser(row) if row else None
+
+def cached_user(user_id, version=0):
+    user = userCache.get(user_id)
+    if user is None or user.version < version:
+        user = load_user(user_id)
+        if user is None:
+            return None
+        userCache.set(user_id, user)
+    return user
+
+def current_user():
+    return cached_user(get_jwt_identity(), get_jwt().get("ver", 0))
+
+def supabase_user(info):
+    try:
+        return cached_user(str(uuid.UUID(str(info.get("id")))))
+    except ValueError:
+        return None
+
+def invalidate_user(user_id):
+    userCache.pop(str(user_id))
+
+def token_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        authHeader = request.headers.get("Authorization")
+        if is_supabase_token(authHeader):
+            info = verify_token(authHeader)
+            if info is None:
+                return {"error": "Invalid token"}, 401
+            g.user = supabase_user(info)
+        else:
+            verify_jwt_in_request()
+            g.user = current_user()
+        if g.user is None:
+            return {"error": "User not found"}, 404
+
+        return f(*args, **kwargs)
+    return decorated
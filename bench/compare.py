@@ -0,0 +1,32 @@
+import sys, json, argparse
+
+def rows(baseline, candidate):
+    for name, before in baseline.get("endpoints", {}).items():
+        after = candidate.get("endpoints", {}).get(name)
+        if after is None:
+            continue
+        yield name, before, after
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two bench/run.py result files endpoint by endpoint.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Flag endpoints whose p50 grew by at least this factor.")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    regressions = []
+    print(f"{'endpoint':<16}{'p50 before':>12}{'p50 after':>12}{'ratio':>8}{'queries':>12}")
+    for name, before, after in rows(baseline, candidate):
+        ratio = after["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf")
+        print(f"{name:<16}{before['p50_ms']:>12.2f}{after['p50_ms']:>12.2f}{ratio:>8.2f}{before['queries']:>6} ->{after['queries']:>3}")
+        if ratio >= args.threshold or after["queries"] > before["queries"]:
+            regressions.append(name)
+
+    if regressions:
+        print(f"Regressed: {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
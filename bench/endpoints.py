@@ -0,0 +1,84 @@
+import os, sys, time, statistics, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from api import app
+from models import db, Company, User, Word
+
+def server_timing(header):
+    metrics = {}
+    for part in header.split(","):
+        fields = [field.strip() for field in part.split(";")]
+        values = dict(field.split("=", 1) for field in fields[1:] if "=" in field)
+        metrics[fields[0]] = values
+    db_ = metrics.get("db", {})
+    queries = int(db_.get("desc", '"0 queries"').strip('"').split()[0])
+    return queries, float(db_.get("dur", 0))
+
+def cases():
+    with app.app_context():
+        company = db.session.execute(select(Company.id).order_by(Company.code).limit(1)).scalar()
+        username = db.session.execute(select(User.username).order_by(User.username).limit(1)).scalar()
+        word = db.session.execute(select(Word.word).order_by(Word.word).limit(1)).scalar() or "ka"
+
+    return {
+        "companies": ("GET", "/companies"),
+        "company": ("GET", f"/company/{company}"),
+        "history_daily": ("GET", f"/company/{company}/history"),
+        "history_weekly": ("GET", f"/company/{company}/history?resolution=weekly"),
+        "stocks": ("GET", "/stocks"),
+        "users": ("GET", "/users"),
+        "user": ("GET", f"/user/{username}"),
+        "leaderboard": ("GET", f"/leaderboard?user={username}"),
+        "names": ("GET", "/names"),
+        "fetch_page": ("GET", "/fetch?limit=100"),
+        "fetch_search": ("GET", f"/fetch?q={word[:3]}&limit=100"),
+        "word": ("GET", f"/word?q={word}"),
+        "stock_update": ("POST", "/stock-update")
+    }
+
+def measure(client, method, path, repeat, headers):
+    durations, dbTimes, queries, status = [], [], 0, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.open(path, method=method, headers=headers)
+        durations.append(time.perf_counter() - started)
+        status = response.status_code
+        queries, dbMs = server_timing(response.headers.get("Server-Timing", ""))
+        dbTimes.append(dbMs)
+
+    durations.sort()
+    return {
+        "path": path,
+        "status": status,
+        "queries": queries,
+        "mean_ms": round(statistics.mean(durations) * 1000, 3),
+        "p50_ms": round(statistics.median(durations) * 1000, 3),
+        "p95_ms": round(durations[max(int(len(durations) * 0.95) - 1, 0)] * 1000, 3),
+        "db_ms": round(statistics.mean(dbTimes), 3),
+        "bytes": len(response.get_data())
+    }
+
+def run(repeat, names=None, cache=False):
+    os.environ.setdefault("CRON_SECRET", "bench")
+    app.config["HTTP_CACHE"] = cache
+    app.config["PROFILE_SAMPLE_RATE"] = 1.0
+    headers = {"X-CRON-KEY": os.environ["CRON_SECRET"]}
+    client = app.test_client()
+
+    selected = {name: case for name, case in cases().items() if names is None or name in names}
+    report = {}
+    for name, (method, path) in selected.items():
+        client.open(path, method=method, headers=headers)
+        report[name] = measure(client, method, path, repeat, headers)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time each endpoint against the data in DATABASE_URL and report latency and query counts.")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", default=None, help="Comma separated case names.")
+    parser.add_argument("--cache", action="store_true", help="Leave the HTTP response cache enabled.")
+    args = parser.parse_args()
+
+    print(run(args.repeat, args.only.split(",") if args.only else None, args.cache))
@@ -0,0 +1,84 @@
+import os, sys, time, random, argparse
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import app
+from models import db, Company, Ownership, SharePrice, User
+from quotes import refresh_quotes
+
+def seed(balance, price):
+    suffix = str(random.randint(0, 10 ** 9))
+    company = Company(
+        name=f"Load {suffix}", code=f"LOAD{suffix}", total_shares=10 ** 9, float_shares=10 ** 9,
+        insider_shares=0, gov_shares=0, dividends=0
+    )
+    user = User(username=f"load{suffix}", name="Load", color="#000000", balance=balance)
+    user.set_password(suffix)
+    db.session.add_all([company, user])
+    db.session.flush()
+    db.session.add(SharePrice(company_id=company.id, day=0, price=price))
+    db.session.commit()
+    refresh_quotes()
+    return str(user.id), user.username, suffix, str(company.id)
+
+def run(orders, workers, balance, price):
+    with app.app_context():
+        user_id, username, password, company_id = seed(balance, price)
+
+    client = app.test_client()
+    token = client.post("/auth/login", json={"username": username, "password": password}).json["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def place(i):
+        side = "buy" if i % 3 else "sell"
+        shares = random.randint(1, 5)
+        response = app.test_client().post(f"/stocks/{side}", headers=headers, json={"company_id": company_id, "shares": shares})
+        return side, shares, response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(place, range(orders)))
+    elapsed = time.perf_counter() - started
+
+    bought = sum(shares for side, shares, status in results if side == "buy" and status == 200)
+    sold = sum(shares for side, shares, status in results if side == "sell" and status == 200)
+    errors = [status for side, shares, status in results if status not in (200, 400)]
+
+    with app.app_context():
+        final_balance = db.session.get(User, user_id).balance
+        ownership = Ownership.query.filter_by(user_id=user_id, company_id=company_id).first()
+        held = ownership.shares_owned if ownership else 0
+
+    expected_balance = Decimal(balance) - Decimal(str(price)) * (bought - sold)
+    checks = {
+        "balance_non_negative": final_balance >= 0,
+        "balance_matches_fills": final_balance == expected_balance,
+        "shares_match_fills": held == bought - sold,
+        "no_server_errors": not errors
+    }
+
+    return {
+        "orders": orders,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "orders_per_second": round(orders / elapsed, 1),
+        "filled": sum(1 for r in results if r[2] == 200),
+        "rejected": sum(1 for r in results if r[2] == 400),
+        "server_errors": len(errors),
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fire parallel buy/sell orders at one account and check the balance and share invariants.")
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--balance", type=int, default=5000)
+    parser.add_argument("--price", type=float, default=12.34)
+    args = parser.parse_args()
+
+    report = run(args.orders, args.workers, args.balance, args.price)
+    print(report)
+    sys.exit(0 if report["ok"] else 1)
@@ -0,0 +1,33 @@
+import os, shutil, tempfile, subprocess, contextlib
+
+def pg_binary(name):
+    directory = os.environ.get("PG_BIN")
+    if directory:
+        return os.path.join(directory, name)
+    found = shutil.which(name)
+    if found is None:
+        raise RuntimeError(f"{name} not found, install PostgreSQL or set PG_BIN")
+    return found
+
+@contextlib.contextmanager
+def disposable_postgres(database="bench"):
+    if os.geteuid() == 0:
+        raise RuntimeError("initdb refuses to run as root, run the benchmark as an unprivileged user or pass --database-url")
+
+    root = tempfile.mkdtemp(prefix="lutinex-bench-")
+    data = os.path.join(root, "data")
+    subprocess.run(
+        [pg_binary("initdb"), "-D", data, "-U", "postgres", "-A", "trust", "-E", "UTF8"],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    subprocess.run(
+        [pg_binary("pg_ctl"), "-D", data, "-l", os.path.join(root, "postgres.log"), "-w",
+         "-o", f"-c listen_addresses='' -k {root}", "start"],
+        check=True, stdout=subprocess.DEVNULL
+    )
+    try:
+        subprocess.run([pg_binary("createdb"), "-h", root, "-U", "postgres", database], check=True)
+        yield f"postgresql+psycopg2://postgres@/{database}?host={root}"
+    finally:
+        subprocess.run([pg_binary("pg_ctl"), "-D", data, "-m", "immediate", "-w", "stop"], stdout=subprocess.DEVNULL)
+        shutil.rmtree(root, ignore_errors=True)
@@ -0,0 +1,82 @@
+import os, sys, json, time, argparse, platform, subprocess, contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from postgres import disposable_postgres
+
+SCALING_CASES = ["company", "history_daily", "history_weekly", "stocks", "users", "user", "leaderboard", "stock_update"]
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def sizes(values):
+    return [int(value) for value in values.split(",") if value]
+
+def suite(args):
+    import seed, endpoints, order_load
+    from sqlalchemy import text
+    from api import app
+    from models import db
+
+    base = {"companies": args.companies, "users": args.users, "holdings": args.holdings, "days": args.days, "words": args.words}
+    with app.app_context():
+        server = db.session.execute(text("SHOW server_version")).scalar()
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "postgres": server,
+            "repeat": args.repeat,
+            "http_cache": args.cache
+        },
+        "dataset": seed.generate(**base, seed=args.seed)
+    }
+    results["endpoints"] = endpoints.run(args.repeat, cache=args.cache)
+    results["load"] = order_load.run(args.orders, args.workers, 5000, 12.34)
+
+    results["scaling"] = {"days": [], "users": []}
+    for days in sizes(args.scale_days):
+        dataset = seed.generate(**{**base, "days": days}, seed=args.seed)
+        results["scaling"]["days"].append({"dataset": dataset, "endpoints": endpoints.run(args.repeat, SCALING_CASES, args.cache)})
+    for users in sizes(args.scale_users):
+        holdings = args.holdings * users // args.users
+        dataset = seed.generate(**{**base, "users": users, "holdings": holdings}, seed=args.seed)
+        results["scaling"]["users"].append({"dataset": dataset, "endpoints": endpoints.run(args.repeat, SCALING_CASES, args.cache)})
+
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed a database, benchmark every endpoint, run the order load test and measure scaling with price history and user count.")
+    parser.add_argument("--database-url", default=None, help="Use this (disposable) database instead of starting a temporary Postgres.")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--holdings", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--orders", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--scale-days", default="30,365,1095")
+    parser.add_argument("--scale-users", default="100,1000,5000")
+    parser.add_argument("--cache", action="store_true", help="Leave the HTTP response cache enabled.")
+    parser.add_argument("--output", default=None, help="Write the JSON results to this file.")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        os.environ["DATABASE_URL"] = args.database_url or stack.enter_context(disposable_postgres())
+        results = suite(args)
+
+    report = json.dumps(results, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    print(report)
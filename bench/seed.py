@@ -0,0 +1,125 @@
+import os, sys, time, uuid, random, argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+from api import app
+from models import db, Word, Morpheme, Company, Ownership, SharePrice, User
+from market import simulate_prices
+from quotes import refresh_quotes
+from rollups import rebuild_rollups, refresh_stats
+from lexicon import render_lexicon_scripts
+
+BATCH_SIZE = 5000
+CONSONANTS = "pbfvkgtdzhjlmnrsc"
+VOWELS = "aäioöu"
+WORD_TYPES = ["general", "special", "replaceable", "combination"]
+
+def make_id(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+def make_word(rng):
+    return "".join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(1, 4)))
+
+def insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(model.__table__.insert(), rows[start:start + BATCH_SIZE])
+
+def reset_schema():
+    db.create_all()
+    tables = [table.name for table in db.metadata.sorted_tables if table.name != "lexicon_version"]
+    db.session.execute(text(f"TRUNCATE {', '.join(tables)} CASCADE"))
+    db.session.commit()
+
+def generate(companies, users, holdings, days, words, seed=0):
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    with app.app_context():
+        reset_schema()
+
+        companyIds = [make_id(rng) for _ in range(companies)]
+        insert(Company, [{
+            "id": company_id,
+            "name": f"Bench Company {i}",
+            "code": f"B{i:05d}",
+            "total_shares": 1000000,
+            "float_shares": 600000,
+            "insider_shares": 200000,
+            "gov_shares": 200000,
+            "dividends": rng.choice([0, 0.5, 1, 2])
+        } for i, company_id in enumerate(companyIds)])
+
+        opening = [round(rng.uniform(5, 200), 2) for _ in companyIds]
+        walk = simulate_prices(opening, days - 1, seed)
+        insert(SharePrice, [
+            {"company_id": company_id, "day": 0, "price": price} for company_id, price in zip(companyIds, opening)
+        ] + [
+            {"company_id": company_id, "day": day + 1, "price": float(walk[day, index])}
+            for day in range(days - 1) for index, company_id in enumerate(companyIds)
+        ])
+
+        passwordHash = generate_password_hash("bench")
+        userIds = [make_id(rng) for _ in range(users)]
+        insert(User, [{
+            "id": user_id,
+            "username": f"bench{i}",
+            "name": f"Bench User {i}",
+            "password_hash": passwordHash,
+            "color": "#{:06x}".format(rng.randint(0, 0xFFFFFF)),
+            "balance": rng.randint(1000, 100000)
+        } for i, user_id in enumerate(userIds)])
+
+        pairs = rng.sample(range(users * companies), min(holdings, users * companies))
+        insert(Ownership, [{
+            "user_id": userIds[pair // companies],
+            "company_id": companyIds[pair % companies],
+            "week": days - 1,
+            "shares_owned": rng.randint(1, 500)
+        } for pair in pairs])
+
+        forms = [make_word(rng) for _ in range(words)]
+        insert(Word, [{
+            "word": form,
+            "meaning": [f"meaning of {form}", f"sense {i}"],
+            "type": rng.choice(WORD_TYPES),
+            "phonetic": form,
+            "combination": None
+        } for i, form in enumerate(forms)])
+        insert(Morpheme, [{
+            "morpheme": form[:2],
+            "meaning": [f"part of {form}"],
+            "type": "root",
+            "phonetic": form[:2],
+            "changes": None
+        } for form in forms[:max(words // 10, 1)]])
+        db.session.commit()
+
+        refresh_quotes()
+        rebuild_rollups()
+        refresh_stats()
+        db.session.commit()
+        render_lexicon_scripts()
+
+    return {
+        "companies": companies,
+        "users": users,
+        "holdings": len(pairs),
+        "days": days,
+        "words": words,
+        "seed": seed,
+        "seconds": round(time.perf_counter() - started, 2)
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replace the contents of DATABASE_URL with a generated benchmark dataset.")
+    parser.add_argument("--companies", type=int, default=50)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--holdings", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(generate(args.companies, args.users, args.holdings, args.days, args.words, args.seed))
@@ -0,0 +1,79 @@
+import os, sys, time, uuid, random, argparse, tracemalloc
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serializers import OrjsonProvider
+
+def stocks_payload(companies, holders):
+    return [{
+        "company": {
+            "id": uuid.uuid4(),
+            "name": f"Company {i}",
+            "code": f"C{i}",
+            "price": Decimal("12.34"),
+            "previous_price": Decimal("12.30"),
+            "change": 0.04,
+            "percent_change": 0.325,
+            "total_shares": 1000000
+        },
+        "price_data": [{"day": day, "date": f"{day:02d} Sep", "price": Decimal(random.randint(1000, 2000)) / 100} for day in range(7)],
+        "shares_data": [{
+            "owner": f"Owner {j}",
+            "owner_name": f"Owner {j}",
+            "owner_username": None,
+            "color": "#7E0CE2",
+            "shares": random.randint(1, 1000),
+            "is_user": True
+        } for j in range(holders)]
+    } for i in range(companies)]
+
+def fetch_payload(words):
+    return [{
+        "id": uuid.uuid4(),
+        "word": f"wörd{i}",
+        "meaning": [f"meaning {i}", f"sense {i}"],
+        "type": "general",
+        "phonetic": f"wörd{i}",
+        "combination": None
+    } for i in range(words)]
+
+def measure(provider, app, payload, repeat):
+    with app.app_context():
+        provider.response(payload)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            provider.response(payload)
+        seconds = (time.perf_counter() - started) / repeat
+
+        tracemalloc.start()
+        provider.response(payload)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {"ms": round(seconds * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+def run(companies, holders, words, repeat):
+    app = Flask(__name__)
+    providers = {"default": DefaultJSONProvider(app), "orjson": OrjsonProvider(app)}
+    payloads = {"stocks": stocks_payload(companies, holders), "fetch": fetch_payload(words)}
+
+    report = {}
+    for name, payload in payloads.items():
+        results = {provider: measure(instance, app, payload, repeat) for provider, instance in providers.items()}
+        results["speedup"] = round(results["default"]["ms"] / results["orjson"]["ms"], 1)
+        report[name] = results
+
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare Flask's default JSON provider with the orjson provider on /stocks- and /fetch-shaped payloads.")
+    parser.add_argument("--companies", type=int, default=200)
+    parser.add_argument("--holders", type=int, default=20)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(run(args.companies, args.holders, args.words, args.repeat))
@@ -0,0 +1,77 @@
+import os, time, signal, argparse, statistics, subprocess
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "sync": ["gunicorn", "api:app", "--worker-class", "sync"],
+    "gthread": ["gunicorn", "api:app", "-c", "gunicorn.conf.py"]
+}
+
+def start(mode, port, workers, env):
+    command = MODES[mode] + ["--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--access-logfile", "/dev/null"]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except requests.RequestException:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+def load(port, paths, clients, seconds):
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=clients))
+    deadline = time.monotonic() + seconds
+
+    def client(index):
+        latencies, errors = [], 0
+        while time.monotonic() < deadline:
+            path = paths[(index + len(latencies)) % len(paths)]
+            started = time.perf_counter()
+            try:
+                ok = session.get(f"http://127.0.0.1:{port}{path}", timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        return latencies, errors
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+
+    latencies = sorted(l for ls, e in results for l in ls)
+    return {
+        "requests": len(latencies),
+        "errors": sum(e for ls, e in results),
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2) if latencies else None,
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2) if latencies else None
+    }
+
+def run(modes, paths, clients, seconds, workers, port, cache):
+    env = {**os.environ, "HTTP_CACHE": "1" if cache else "0"}
+    report = {}
+    for mode in modes:
+        server = start(mode, port, workers, env)
+        try:
+            report[mode] = load(port, paths, clients, seconds)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare request throughput of sync gunicorn workers with the gthread configuration in gunicorn.conf.py.")
+    parser.add_argument("--modes", default="sync,gthread")
+    parser.add_argument("--paths", default="/companies,/stocks,/users,/names,/leaderboard")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache", action="store_true", help="Leave the HTTP response cache enabled.")
+    args = parser.parse_args()
+
+    print(run(args.modes.split(","), args.paths.split(","), args.clients, args.seconds, args.workers, args.port, args.cache))
@@ -0,0 +1,99 @@
+import os, time, threading, functools
+from flask import current_app, has_request_context, request
+from sqlalchemy import event, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+from models import db
+
+SLOW_CHECKOUT_MS = 100
+
+class InstrumentedPool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._metrics_lock = threading.Lock()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+
+        waited = time.perf_counter() - started
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+            if waited * 1000 >= SLOW_CHECKOUT_MS:
+                self.slow_checkouts += 1
+        return connection
+
+    def stats(self):
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "slow_checkouts": self.slow_checkouts,
+            "avg_wait_ms": round(self.wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3)
+        }
+
+def engine_options():
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": os.environ.get("DB_POOL_PRE_PING", "1") == "1",
+        "connect_args": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            "application_name": os.environ.get("DB_APPLICATION_NAME", "lutinex-api")
+        }
+    }
+
+def pool_stats():
+    pool = db.engine.pool
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+def statement_timeout(configKey):
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            db.session.execute(text(f"SET LOCAL statement_timeout = {int(current_app.config[configKey])}"))
+            return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def without_statement_timeout(f):
+    f.without_statement_timeout = True
+    return f
+
+def request_statement_timeout():
+    if not has_request_context():
+        return None
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, "without_statement_timeout", False):
+        return None
+    return current_app.config["DB_STATEMENT_TIMEOUT_MS"]
+
+def init_statement_timeout(app):
+    @event.listens_for(db.session, "after_begin")
+    def set_request_timeout(session, transaction, connection):
+        timeout = request_statement_timeout()
+        if timeout:
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
@@ -0,0 +1,69 @@
+import uuid
+from functools import lru_cache
+
+CHAR_PATH = "https://zhyov.github.io/Lutinex/assets/char/"
+CONSONANTS = frozenset(["p", "b", "f", "v", "w", "k", "g", "t", "d", "đ", "z", "ž", "h", "j", "l", "m", "n", "ň", "r", "s", "š", "c", "č", "ç"])
+VOWELS = frozenset(["a", "ä", "ą", "i", "į", "o", "ö"])
+ALAP = "aläp"
+EMPTY = "∅"
+SYLLABLE_CACHE_SIZE = 8192
+MAX_BATCH_SIZE = 1000
+ID_MODES = ("uuid", "seq")
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def syllabify(text):
+    syllables = []
+    final = []
+    i = 0
+
+    while i < len(text):
+        char = text[i]
+        prev = text[i - 1] if i > 0 else None
+        next = text[i + 1] if i + 1 < len(text) else None
+
+        if char in VOWELS and prev not in CONSONANTS:
+            final += (ALAP, char)
+        elif char in CONSONANTS and (next is None or next in CONSONANTS):
+            final += (char, EMPTY)
+        elif char in CONSONANTS and next in VOWELS:
+            final += (char, next)
+            i += 1
+        else:
+            final.append(char)
+
+        if len(final) == 2:
+            syllables.append(tuple(final))
+            final = []
+
+        i += 1
+
+    if final:
+        syllables.append(tuple(final))
+
+    return tuple(syllables)
+
+def glyph_path(glyph):
+    return f"{CHAR_PATH}{glyph}.svg"
+
+def render(text, ids="uuid"):
+    return render_syllables(syllabify(text), ids)
+
+def render_syllables(syllables, ids="uuid"):
+    if ids == "seq":
+        return [{
+            "id": f"s{s}",
+            "syllable": [{"id": f"s{s}g{g}", "path": glyph_path(glyph)} for g, glyph in enumerate(syllable)]
+        } for s, syllable in enumerate(syllables)]
+
+    return [{
+        "id": str(uuid.uuid4()),
+        "syllable": [{"id": str(uuid.uuid4()), "path": glyph_path(glyph)} for glyph in syllable]
+    } for syllable in syllables]
+
+def inline_script(stored, text):
+    syllables = stored if stored is not None else syllabify(text.lower())
+    return render_syllables(syllables, "seq")
+
+def cache_stats():
+    info = syllabify.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
@@ -0,0 +1,23 @@
+import os, multiprocessing
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+max_requests = 5000
+max_requests_jitter = 500
+accesslog = "-"
+errorlog = "-"
+
+def post_worker_init(worker):
+    from api import app
+    from lexicon import lexiconStore
+    from quotes import all_quotes
+
+    with app.app_context():
+        if app.config["LEXICON_SNAPSHOT"]:
+            lexiconStore.get()
+        all_quotes()
@@ -0,0 +1,103 @@
+import datetime
+from sqlalchemy import Date, Integer, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from models import db, SharePrice, PriceRollup
+
+START_DATE = datetime.datetime(2025, 9, 1)
+RESOLUTIONS = ("daily", "weekly", "monthly")
+
+def period_start(resolution, day):
+    if resolution == "weekly":
+        return START_DATE.date() + datetime.timedelta(days=day // 7 * 7)
+    return (START_DATE.date() + datetime.timedelta(days=day)).replace(day=1)
+
+def period_expression(resolution):
+    start = cast(literal(START_DATE.date()), Date)
+    if resolution == "weekly":
+        return start + cast(SharePrice.day // 7 * 7, Integer)
+    return cast(func.date_trunc("month", start + cast(SharePrice.day, Integer)), Date)
+
+def ohlc_columns():
+    return [
+        func.min(SharePrice.day),
+        func.max(SharePrice.day),
+        func.array_agg(aggregate_order_by(SharePrice.price, SharePrice.day.asc()))[1],
+        func.max(SharePrice.price),
+        func.min(SharePrice.price),
+        func.array_agg(aggregate_order_by(SharePrice.price, SharePrice.day.desc()))[1]
+    ]
+
+def bounded(query, company_id, start=None, end=None):
+    query = query.where(SharePrice.company_id == company_id)
+    if start is not None:
+        query = query.where(SharePrice.day >= start)
+    if end is not None:
+        query = query.where(SharePrice.day <= end)
+    return query
+
+def ohlc_rows(rows):
+    return [{
+        "day": first,
+        "end_day": last,
+        "open": float(open_),
+        "high": float(high),
+        "low": float(low),
+        "close": float(close)
+    } for first, last, open_, high, low, close in rows]
+
+def archive_boundary(company_id):
+    oldest, earliest = db.session.execute(select(
+        select(func.min(SharePrice.day)).where(SharePrice.company_id == company_id).scalar_subquery(),
+        select(func.min(PriceRollup.first_day)).where(PriceRollup.company_id == company_id, PriceRollup.resolution == "weekly").scalar_subquery()
+    )).one()
+    if oldest is None or earliest is None or earliest >= oldest:
+        return None
+    return oldest
+
+def reaches_archive(boundary, start):
+    return boundary is not None and (start is None or start < boundary)
+
+def archived_closes(company_id, boundary, start=None, end=None):
+    query = select(PriceRollup.last_day, PriceRollup.close).where(
+        PriceRollup.company_id == company_id,
+        PriceRollup.resolution == "weekly",
+        PriceRollup.last_day < boundary
+    )
+    if start is not None:
+        query = query.where(PriceRollup.last_day >= start)
+    if end is not None:
+        query = query.where(PriceRollup.last_day <= end)
+    return [{"day": day, "price": float(price)} for day, price in db.session.execute(query.order_by(PriceRollup.period_start))]
+
+def daily_history(company_id, start=None, end=None, boundary=None):
+    archived = archived_closes(company_id, boundary, start, end) if reaches_archive(boundary, start) else []
+    query = bounded(select(SharePrice.day, SharePrice.price), company_id, start, end).order_by(SharePrice.day)
+    return archived + [{"day": day, "price": float(price)} for day, price in db.session.execute(query)]
+
+def ohlc_history(company_id, resolution, start=None, end=None):
+    period = period_expression(resolution)
+    query = bounded(select(*ohlc_columns()), company_id, start, end).group_by(period).order_by(period)
+    return ohlc_rows(db.session.execute(query))
+
+def rollup_history(company_id, resolution, start=None, end=None):
+    query = (
+        select(PriceRollup.first_day, PriceRollup.last_day, PriceRollup.open, PriceRollup.high, PriceRollup.low, PriceRollup.close)
+        .where(PriceRollup.company_id == company_id, PriceRollup.resolution == resolution)
+        .order_by(PriceRollup.period_start)
+    )
+    if start is not None:
+        query = query.where(PriceRollup.last_day >= start)
+    if end is not None:
+        query = query.where(PriceRollup.first_day <= end)
+    return ohlc_rows(db.session.execute(query))
+
+def price_history(company_id, resolution="daily", start=None, end=None):
+    if resolution != "daily" and start is None and end is None:
+        return rollup_history(company_id, resolution)
+
+    boundary = archive_boundary(company_id)
+    if resolution == "daily":
+        return daily_history(company_id, start, end, boundary)
+    if reaches_archive(boundary, start):
+        return rollup_history(company_id, resolution, start, end)
+    return ohlc_history(company_id, resolution, start, end)
@@ -0,0 +1,119 @@
+import os, json, hashlib, functools, warnings
+from flask import current_app, request
+from cache import TTLCache
+from lexicon import lexiconStore
+from quotes import market_version, get_current_day
+
+CACHED_HEADERS = ("X-Next-Cursor",)
+
+class LocalBackend:
+    def __init__(self, maxsize, ttl):
+        self.entries = TTLCache(maxsize, ttl)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def set(self, key, entry):
+        self.entries.set(key, entry)
+
+    def stats(self):
+        return {"backend": "local", **self.entries.stats()}
+
+class RedisBackend:
+    def __init__(self, url, ttl):
+        import redis
+        self.redis = redis
+        self.client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key):
+        try:
+            raw = self.client.get(f"http:{key}")
+        except self.redis.RedisError:
+            self.errors += 1
+            return None
+        if raw is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        meta, body = raw.split(b"\n", 1)
+        return {**json.loads(meta), "body": body}
+
+    def set(self, key, entry):
+        meta = json.dumps({field: value for field, value in entry.items() if field != "body"}).encode()
+        try:
+            self.client.set(f"http:{key}", meta + b"\n" + entry["body"], ex=int(self.ttl))
+        except self.redis.RedisError:
+            self.errors += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+def make_backend():
+    ttl = float(os.environ.get("HTTP_CACHE_TTL", 300))
+    if os.environ.get("REDIS_URL"):
+        try:
+            return RedisBackend(os.environ["REDIS_URL"], ttl)
+        except ImportError:
+            warnings.warn("REDIS_URL is set but the redis package is not installed; using the in-process HTTP cache")
+    return LocalBackend(int(os.environ.get("HTTP_CACHE_SIZE", 512)), ttl)
+
+responseCache = make_backend()
+
+def scope_version(scope):
+    if scope == "market":
+        return f"{market_version()}.{get_current_day()}"
+    if scope == "lexicon":
+        if current_app.config["LEXICON_SNAPSHOT"]:
+            return lexiconStore.get().version
+        return lexiconStore.current_version()
+    return 0
+
+def cached_entry(response):
+    body = response.get_data()
+    return {
+        "etag": hashlib.sha256(body).hexdigest()[:32],
+        "mimetype": response.mimetype,
+        "headers": {header: response.headers[header] for header in CACHED_HEADERS if header in response.headers},
+        "body": body
+    }
+
+def respond(entry):
+    response = current_app.response_class(entry["body"], mimetype=entry["mimetype"], headers=entry["headers"])
+    response.set_etag(entry["etag"])
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config["HTTP_CACHE_MAX_AGE"]
+    response.cache_control.must_revalidate = True
+    return response.make_conditional(request)
+
+def cached_response(scope):
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not current_app.config["HTTP_CACHE"]:
+                return f(*args, **kwargs)
+
+            key = f"{scope}:{scope_version(scope)}:{request.full_path}"
+            entry = responseCache.get(key)
+            if entry is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                entry = cached_entry(response)
+                responseCache.set(key, entry)
+
+            return respond(entry)
+        return wrapper
+    return decorator
@@ -0,0 +1,157 @@
+import threading, time
+from flask import current_app
+from sqlalchemy import bindparam, case, func, select
+from models import db, Word, Morpheme, LexiconVersion
+from eshakap import syllabify, inline_script
+
+RENDER_BATCH_SIZE = 1000
+
+WORD_FIELDS = ["id", "word", "meaning", "type", "phonetic", "combination"]
+MORPHEME_FIELDS = ["id", "morpheme", "meaning", "type", "phonetic", "changes"]
+
+def stored_script(model, form):
+    return case((model.script_source == func.lower(form), model.script), else_=None)
+
+def script_columns(model, form):
+    return [stored_script(model, form).label("_script"), form.label("_form")]
+
+class WordRecord:
+    __slots__ = WORD_FIELDS + ["script"]
+
+    def __init__(self, values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+        self.id = str(self.id)
+
+    def to_dict(self, script=False):
+        result = {field: getattr(self, field) for field in WORD_FIELDS}
+        if script:
+            result["script"] = inline_script(self.script, self.word)
+        return result
+
+class MorphemeRecord:
+    __slots__ = MORPHEME_FIELDS + ["script"]
+
+    def __init__(self, values):
+        for field, value in zip(self.__slots__, values):
+            setattr(self, field, value)
+        self.id = str(self.id)
+
+    def to_dict(self, script=False):
+        result = {field: getattr(self, field) for field in MORPHEME_FIELDS}
+        if script:
+            result["script"] = inline_script(self.script, self.morpheme)
+        return result
+
+class LexiconSnapshot:
+    __slots__ = ("version", "words", "morphemes", "words_by_form", "morphemes_by_form")
+
+    def __init__(self, version, words, morphemes):
+        self.version = version
+        self.words = words
+        self.morphemes = morphemes
+        self.words_by_form = {}
+        self.morphemes_by_form = {}
+        for record in words:
+            self.words_by_form.setdefault(record.word.lower(), []).append(record)
+        for record in morphemes:
+            self.morphemes_by_form.setdefault(record.morpheme.lower(), []).append(record)
+
+class LexiconStore:
+    def __init__(self):
+        self.snapshot = None
+        self.checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.last_reload_seconds = None
+        self._lock = threading.Lock()
+
+    def current_version(self):
+        return db.session.execute(select(LexiconVersion.version).where(LexiconVersion.id == 1)).scalar() or 0
+
+    def load(self, version):
+        started = time.perf_counter()
+        words = [WordRecord(row) for row in db.session.execute(
+            select(*[getattr(Word, f) for f in WORD_FIELDS], stored_script(Word, Word.word)).order_by(Word.id)
+        )]
+        morphemes = [MorphemeRecord(row) for row in db.session.execute(
+            select(*[getattr(Morpheme, f) for f in MORPHEME_FIELDS], stored_script(Morpheme, Morpheme.morpheme)).order_by(Morpheme.id)
+        )]
+        self.snapshot = LexiconSnapshot(version, words, morphemes)
+        self.reloads += 1
+        self.last_reload_seconds = round(time.perf_counter() - started, 4)
+
+    def get(self):
+        interval = current_app.config["LEXICON_CHECK_INTERVAL"]
+        if self.snapshot is not None and time.monotonic() - self.checked_at < interval:
+            return self.snapshot
+
+        with self._lock:
+            if self.snapshot is None or time.monotonic() - self.checked_at >= interval:
+                version = self.current_version()
+                if self.snapshot is None or self.snapshot.version != version:
+                    self.load(version)
+                self.checked_at = time.monotonic()
+
+        return self.snapshot
+
+    def stats(self):
+        served = self.hits + self.misses
+        return {
+            "enabled": current_app.config["LEXICON_SNAPSHOT"],
+            "version": self.snapshot.version if self.snapshot else None,
+            "words": len(self.snapshot.words) if self.snapshot else 0,
+            "morphemes": len(self.snapshot.morphemes) if self.snapshot else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / served, 4) if served else 0.0,
+            "reloads": self.reloads,
+            "last_reload_seconds": self.last_reload_seconds
+        }
+
+lexiconStore = LexiconStore()
+
+def get_lexicon():
+    if not current_app.config["LEXICON_SNAPSHOT"]:
+        return None
+
+    lexiconStore.hits += 1
+    return lexiconStore.get()
+
+def lexicon_miss():
+    if current_app.config["LEXICON_SNAPSHOT"]:
+        lexiconStore.misses += 1
+
+def render_scripts(model, form, full=False):
+    query = select(model.id, func.lower(form))
+    if not full:
+        query = query.where(model.script_source.is_distinct_from(func.lower(form)))
+
+    table = model.__table__
+    statement = (
+        table.update()
+        .where(table.c.id == bindparam("row_id"))
+        .values(script=bindparam("rendered"), script_source=bindparam("source"))
+    )
+
+    pending = db.session.execute(query).all()
+    for start in range(0, len(pending), RENDER_BATCH_SIZE):
+        db.session.execute(statement, [
+            {"row_id": row_id, "rendered": syllabify(source), "source": source}
+            for row_id, source in pending[start:start + RENDER_BATCH_SIZE]
+        ])
+    db.session.commit()
+
+    return len(pending)
+
+def render_lexicon_scripts(full=False):
+    started = time.perf_counter()
+    words = render_scripts(Word, Word.word, full)
+    morphemes = render_scripts(Morpheme, Morpheme.morpheme, full)
+
+    return {
+        "words": words,
+        "morphemes": morphemes,
+        "seconds": round(time.perf_counter() - started, 3)
+    }
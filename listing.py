@@ -0,0 +1,106 @@
+import base64, json, uuid
+from flask import Response, current_app, jsonify, request, stream_with_context
+from sqlalchemy import bindparam, select, tuple_
+from sqlalchemy.dialects.postgresql import UUID
+from models import db
+from eshakap import inline_script
+
+MAX_PAGE_SIZE = 1000
+STREAM_BATCH_SIZE = 500
+
+def encode_cursor(values):
+    values = [str(v) if isinstance(v, uuid.UUID) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(cursor, ordering):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(ordering):
+            raise ValueError
+        return [
+            bindparam(None, uuid.UUID(value) if isinstance(expr.type, UUID) else value, type_=expr.type)
+            for expr, value in zip(ordering, values)
+        ]
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def is_plain_listing():
+    return not any(request.args.get(arg) for arg in ("limit", "after", "fields", "format", "stream"))
+
+def parse_fields(allowed, default):
+    fields = request.args.get("fields")
+    if not fields:
+        return default
+
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in allowed]
+    if unknown or not selected:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields selected")
+    return selected
+
+def parse_limit():
+    limit = request.args.get("limit")
+    if limit is None:
+        return None
+    if not limit.isdigit() or int(limit) <= 0:
+        raise ValueError("Invalid limit")
+    return min(int(limit), MAX_PAGE_SIZE)
+
+def list_response(model, fields, conditions, ordering, flat=False, script=None):
+    try:
+        selected = [fields[0]] if flat else parse_fields(fields, fields)
+        limit = parse_limit()
+        after = request.args.get("after")
+        keyset = decode_cursor(after, ordering) if after else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    columns = [getattr(model, f) for f in selected]
+    if script is not None:
+        columns += script
+    sortKeys = [expr.label(f"_sort{i}") for i, expr in enumerate(ordering)]
+    statement = select(*columns, *sortKeys).where(*conditions).order_by(*ordering)
+    if keyset:
+        statement = statement.where(tuple_(*ordering) > tuple_(*keyset))
+
+    def shape(row):
+        if flat:
+            return row[0]
+        result = dict(zip(selected, row))
+        if script is not None:
+            stored, form = row[len(selected):len(selected) + 2]
+            result["script"] = inline_script(stored, form)
+        return result
+
+    if limit is None and (request.args.get("format") == "ndjson" or request.args.get("stream")):
+        return stream_rows(statement, shape, request.args.get("format") == "ndjson")
+
+    if limit is not None:
+        statement = statement.limit(limit + 1)
+
+    rows = db.session.execute(statement).all()
+    response = jsonify([shape(row) for row in rows[:limit]])
+    if limit is not None and len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[limit - 1][-len(ordering):])
+
+    return response
+
+def stream_rows(statement, shape, ndjson):
+    def generate():
+        rows = db.session.execute(statement.execution_options(yield_per=STREAM_BATCH_SIZE))
+        if ndjson:
+            for row in rows:
+                yield current_app.json.dumps(shape(row)) + "\n"
+            return
+
+        yield "["
+        separator = ""
+        for row in rows:
+            yield separator + current_app.json.dumps(shape(row))
+            separator = ","
+        yield "]"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson" if ndjson else "application/json"
+    )
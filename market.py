@@ -0,0 +1,215 @@
+import random, time
+import numpy as np
+from decimal import Decimal
+from sqlalchemy import select, bindparam
+from models import db, Company, Ownership, SharePrice, User
+from quotes import fill_missing_quotes, invalidate_quotes, bump_market_version
+from portfolio import refresh_net_worth
+from rollups import add_rollup_prices, rebuild_rollups, refresh_stats
+from price_storage import ensure_price_partitions
+
+PRICE_STEP = 285
+PRICE_STEP_SCALE = 100.0 * 1000
+SIMULATION_BATCH_SIZE = 5000
+MAX_SIMULATION_DAYS = 3650
+
+def next_prices(latest):
+    return [{
+        "company_id": company_id,
+        "day": day + 1,
+        "price": round(float(price) * (1 + random.randint(-PRICE_STEP, PRICE_STEP) / PRICE_STEP_SCALE), 2)
+    } for company_id, day, price in latest]
+
+def dividend_credits(prices):
+    priceByCompany = {str(p["company_id"]): Decimal(str(p["price"])) for p in prices}
+    rows = db.session.execute(
+        select(Ownership.user_id, Ownership.company_id, Ownership.shares_owned, Company.dividends)
+        .join(Company, Company.id == Ownership.company_id)
+        .where(Company.dividends > 0)
+    ).all()
+
+    credits = {}
+    for user_id, company_id, shares_owned, dividends in rows:
+        price = priceByCompany.get(str(company_id))
+        if price is None:
+            continue
+        credits[user_id] = credits.get(user_id, 0) + shares_owned * price * dividends / 100
+
+    return [{"user_id": user_id, "amount": credits[user_id]} for user_id in sorted(credits) if credits[user_id]]
+
+def run_tick():
+    timings = {}
+    started = time.perf_counter()
+
+    fill_missing_quotes()
+    latest = db.session.execute(
+        select(Company.id, Company.latest_day, Company.latest_price)
+        .where(Company.latest_day.isnot(None))
+    ).all()
+    timings["read_prices"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    prices = next_prices(latest)
+    timings["compute_prices"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if prices:
+        ensure_price_partitions(max(p["day"] for p in prices))
+        db.session.execute(SharePrice.__table__.insert(), prices)
+    timings["write_prices"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if prices:
+        companies = Company.__table__
+        db.session.execute(
+            companies.update()
+            .where(companies.c.id == bindparam("company_id"))
+            .values(
+                previous_price=companies.c.latest_price,
+                latest_price=bindparam("price"),
+                latest_day=bindparam("day")
+            ),
+            prices
+        )
+    timings["write_quotes"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    add_rollup_prices(prices)
+    refresh_stats()
+    timings["write_rollups"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    credits = dividend_credits(prices)
+    timings["compute_dividends"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if credits:
+        users = User.__table__
+        db.session.execute(
+            users.update()
+            .where(users.c.id == bindparam("user_id"))
+            .values(balance=users.c.balance + bindparam("amount")),
+            credits
+        )
+    timings["write_dividends"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    refresh_net_worth()
+    timings["write_net_worth"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    db.session.commit()
+    invalidate_quotes()
+    bump_market_version()
+    timings["commit"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "companies": len(latest),
+        "prices_inserted": len(prices),
+        "holders_credited": len(credits),
+        "timings_ms": {phase: round(seconds * 1000, 2) for phase, seconds in timings.items()}
+    }
+
+def simulate_prices(start, days, seed=None):
+    generator = np.random.default_rng(seed)
+    steps = 1 + generator.integers(-PRICE_STEP, PRICE_STEP + 1, size=(days, len(start))) / PRICE_STEP_SCALE
+    prices = np.empty((days, len(start)))
+    current = np.array(start, dtype=float)
+    for day in range(days):
+        current = np.round(current * steps[day], 2)
+        prices[day] = current
+    return prices
+
+def run_simulation(days, seed=None):
+    timings = {}
+    started = time.perf_counter()
+
+    fill_missing_quotes()
+    latest = db.session.execute(
+        select(Company.id, Company.latest_day, Company.latest_price)
+        .where(Company.latest_day.isnot(None))
+        .order_by(Company.id)
+    ).all()
+    timings["read_prices"] = time.perf_counter() - started
+
+    mark = time.perf_counter()
+    prices = simulate_prices([float(price) for company_id, day, price in latest], days, seed)
+    timings["compute_prices"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    rows = [{
+        "company_id": company_id,
+        "day": day + offset + 1,
+        "price": float(prices[offset, index])
+    } for offset in range(days) for index, (company_id, day, price) in enumerate(latest)]
+    if rows:
+        ensure_price_partitions(max(day for company_id, day, price in latest) + days)
+    for start in range(0, len(rows), SIMULATION_BATCH_SIZE):
+        db.session.execute(SharePrice.__table__.insert(), rows[start:start + SIMULATION_BATCH_SIZE])
+    timings["write_prices"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if latest:
+        companies = Company.__table__
+        db.session.execute(
+            companies.update()
+            .where(companies.c.id == bindparam("company_id"))
+            .values(
+                previous_price=bindparam("previous"),
+                latest_price=bindparam("price"),
+                latest_day=bindparam("day")
+            ),
+            [{
+                "company_id": company_id,
+                "previous": float(prices[-2, index]) if days > 1 else price,
+                "price": float(prices[-1, index]),
+                "day": day + days
+            } for index, (company_id, day, price) in enumerate(latest)]
+        )
+    timings["write_quotes"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if latest:
+        rebuild_rollups(from_day=min(day for company_id, day, price in latest) + 1)
+        refresh_stats()
+    timings["write_rollups"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    totals = prices.sum(axis=0)
+    credits = dividend_credits([
+        {"company_id": company_id, "price": round(float(totals[index]), 2)}
+        for index, (company_id, day, price) in enumerate(latest)
+    ])
+    timings["compute_dividends"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    if credits:
+        users = User.__table__
+        db.session.execute(
+            users.update()
+            .where(users.c.id == bindparam("user_id"))
+            .values(balance=users.c.balance + bindparam("amount")),
+            credits
+        )
+    timings["write_dividends"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    refresh_net_worth()
+    timings["write_net_worth"] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    db.session.commit()
+    invalidate_quotes()
+    bump_market_version()
+    timings["commit"] = time.perf_counter() - mark
+    timings["total"] = time.perf_counter() - started
+
+    return {
+        "companies": len(latest),
+        "days": days,
+        "seed": seed,
+        "prices_inserted": len(rows),
+        "holders_credited": len(credits),
+        "timings_ms": {phase: round(seconds * 1000, 2) for phase, seconds in timings.items()}
+    }
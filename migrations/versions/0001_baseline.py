@@ -0,0 +1,94 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises: 
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'words',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('word', sa.String(), nullable=False),
+        sa.Column('meaning', postgresql.JSONB(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('phonetic', sa.String(), nullable=False),
+        sa.Column('combination', postgresql.JSONB(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'morphemes',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('morpheme', sa.String(), nullable=False),
+        sa.Column('meaning', postgresql.JSONB(), nullable=False),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('phonetic', sa.String(), nullable=False),
+        sa.Column('changes', postgresql.JSONB(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'companies',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('code', sa.String(), nullable=False),
+        sa.Column('total_shares', sa.BigInteger(), nullable=False),
+        sa.Column('float_shares', sa.BigInteger(), nullable=False),
+        sa.Column('insider_shares', sa.BigInteger(), nullable=False),
+        sa.Column('gov_shares', sa.BigInteger(), nullable=False),
+        sa.Column('dividends', sa.Numeric(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code')
+    )
+    op.create_table(
+        'users',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=False),
+        sa.Column('own_company', sa.String(), nullable=True),
+        sa.Column('color', sa.String(), nullable=False),
+        sa.Column('balance', sa.Numeric(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('username')
+    )
+    op.create_table(
+        'ownerships',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('company_id', postgresql.UUID(), nullable=False),
+        sa.Column('user_id', postgresql.UUID(), nullable=False),
+        sa.Column('week', sa.BigInteger(), nullable=False),
+        sa.Column('shares_owned', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'share_prices',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('company_id', postgresql.UUID(), nullable=False),
+        sa.Column('day', sa.BigInteger(), nullable=False),
+        sa.Column('price', sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('share_prices')
+    op.drop_table('ownerships')
+    op.drop_table('users')
+    op.drop_table('companies')
+    op.drop_table('morphemes')
+    op.drop_table('words')
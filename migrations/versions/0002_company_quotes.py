@@ -0,0 +1,43 @@
+"""current quote columns on companies
+
+Revision ID: 0002_company_quotes
+Revises: 0001_baseline
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_company_quotes'
+down_revision = '0001_baseline'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('companies', sa.Column('latest_price', sa.Numeric(), nullable=True))
+    op.add_column('companies', sa.Column('previous_price', sa.Numeric(), nullable=True))
+    op.add_column('companies', sa.Column('latest_day', sa.BigInteger(), nullable=True))
+    op.execute("""
+        WITH ranked AS (
+            SELECT company_id, day, price,
+                   row_number() OVER (PARTITION BY company_id ORDER BY day DESC) AS rank
+            FROM share_prices
+        )
+        UPDATE companies SET
+            latest_price = latest.price,
+            latest_day = latest.day,
+            previous_price = previous.price
+        FROM ranked AS latest
+        LEFT JOIN ranked AS previous
+            ON previous.company_id = latest.company_id AND previous.rank = 2
+        WHERE latest.rank = 1 AND latest.company_id = companies.id
+    """)
+
+
+def downgrade():
+    op.drop_column('companies', 'latest_day')
+    op.drop_column('companies', 'previous_price')
+    op.drop_column('companies', 'latest_price')
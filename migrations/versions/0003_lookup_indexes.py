@@ -0,0 +1,63 @@
+"""indexes for price, ownership and lexicon lookups
+
+Revision ID: 0003_lookup_indexes
+Revises: 0002_company_quotes
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_lookup_indexes'
+down_revision = '0002_company_quotes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("""
+        DELETE FROM share_prices AS duplicate
+        USING share_prices AS kept
+        WHERE duplicate.company_id = kept.company_id
+          AND duplicate.day = kept.day
+          AND duplicate.id > kept.id
+    """)
+    op.create_index(
+        'ix_share_prices_company_day',
+        'share_prices',
+        ['company_id', sa.text('day DESC')],
+        unique=True
+    )
+
+    op.execute("""
+        WITH merged AS (
+            SELECT min(id::text)::uuid AS kept_id, user_id, company_id, sum(shares_owned) AS shares_owned
+            FROM ownerships
+            GROUP BY user_id, company_id
+            HAVING count(*) > 1
+        ), updated AS (
+            UPDATE ownerships SET shares_owned = merged.shares_owned
+            FROM merged
+            WHERE ownerships.id = merged.kept_id
+        )
+        DELETE FROM ownerships
+        USING merged
+        WHERE ownerships.user_id = merged.user_id
+          AND ownerships.company_id = merged.company_id
+          AND ownerships.id <> merged.kept_id
+    """)
+    op.create_unique_constraint('uq_ownerships_user_company', 'ownerships', ['user_id', 'company_id'])
+    op.create_index('ix_ownerships_company_id', 'ownerships', ['company_id'])
+
+    op.create_index('ix_words_word_lower', 'words', [sa.text('lower(word)')])
+    op.create_index('ix_morphemes_morpheme_lower', 'morphemes', [sa.text('lower(morpheme)')])
+
+
+def downgrade():
+    op.drop_index('ix_morphemes_morpheme_lower', table_name='morphemes')
+    op.drop_index('ix_words_word_lower', table_name='words')
+    op.drop_index('ix_ownerships_company_id', table_name='ownerships')
+    op.drop_constraint('uq_ownerships_user_company', 'ownerships', type_='unique')
+    op.drop_index('ix_share_prices_company_day', table_name='share_prices')
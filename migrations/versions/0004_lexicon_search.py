@@ -0,0 +1,37 @@
+"""trigram search over words and morphemes
+
+Revision ID: 0004_lexicon_search
+Revises: 0003_lookup_indexes
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_lexicon_search'
+down_revision = '0003_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('words', sa.Column('search_text', sa.Text(), sa.Computed("lower(word || ' ' || meaning::text)", persisted=True)))
+    op.create_index('ix_words_word_trgm', 'words', [sa.text('lower(word) gin_trgm_ops')], postgresql_using='gin')
+    op.create_index('ix_words_search_text_trgm', 'words', ['search_text'], postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+    op.add_column('morphemes', sa.Column('search_text', sa.Text(), sa.Computed("lower(morpheme || ' ' || meaning::text)", persisted=True)))
+    op.create_index('ix_morphemes_morpheme_trgm', 'morphemes', [sa.text('lower(morpheme) gin_trgm_ops')], postgresql_using='gin')
+    op.create_index('ix_morphemes_search_text_trgm', 'morphemes', ['search_text'], postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_morphemes_search_text_trgm', table_name='morphemes')
+    op.drop_index('ix_morphemes_morpheme_trgm', table_name='morphemes')
+    op.drop_column('morphemes', 'search_text')
+    op.drop_index('ix_words_search_text_trgm', table_name='words')
+    op.drop_index('ix_words_word_trgm', table_name='words')
+    op.drop_column('words', 'search_text')
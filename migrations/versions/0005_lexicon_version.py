@@ -0,0 +1,52 @@
+"""lexicon version counter maintained by triggers
+
+Revision ID: 0005_lexicon_version
+Revises: 0004_lexicon_search
+Create Date: 2026-10-17 09:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_lexicon_version'
+down_revision = '0004_lexicon_search'
+branch_labels = None
+depends_on = None
+
+LEXICON_VERSION_DDL = """
+INSERT INTO lexicon_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_lexicon_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE lexicon_version SET version = version + 1 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER words_lexicon_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON words
+FOR EACH STATEMENT EXECUTE FUNCTION bump_lexicon_version();
+
+CREATE OR REPLACE TRIGGER morphemes_lexicon_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON morphemes
+FOR EACH STATEMENT EXECUTE FUNCTION bump_lexicon_version();
+"""
+
+
+def upgrade():
+    op.create_table(
+        'lexicon_version',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(LEXICON_VERSION_DDL)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS morphemes_lexicon_version ON morphemes")
+    op.execute("DROP TRIGGER IF EXISTS words_lexicon_version ON words")
+    op.execute("DROP FUNCTION IF EXISTS bump_lexicon_version()")
+    op.drop_table('lexicon_version')
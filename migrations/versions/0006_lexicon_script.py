@@ -0,0 +1,31 @@
+"""precomputed Eshakap script for words and morphemes
+
+Revision ID: 0006_lexicon_script
+Revises: 0005_lexicon_version
+Create Date: 2026-10-17 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_lexicon_script'
+down_revision = '0005_lexicon_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('words', sa.Column('script', postgresql.JSONB(), nullable=True))
+    op.add_column('words', sa.Column('script_source', sa.Text(), nullable=True))
+    op.add_column('morphemes', sa.Column('script', postgresql.JSONB(), nullable=True))
+    op.add_column('morphemes', sa.Column('script_source', sa.Text(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('morphemes', 'script_source')
+    op.drop_column('morphemes', 'script')
+    op.drop_column('words', 'script_source')
+    op.drop_column('words', 'script')
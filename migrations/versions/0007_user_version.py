@@ -0,0 +1,24 @@
+"""user row version for the per-worker user cache
+
+Revision ID: 0007_user_version
+Revises: 0006_lexicon_script
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_user_version'
+down_revision = '0006_lexicon_script'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade():
+    op.drop_column('users', 'version')
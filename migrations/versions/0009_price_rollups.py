@@ -0,0 +1,63 @@
+"""weekly/monthly price rollups and per-company statistics
+
+Revision ID: 0009_price_rollups
+Revises: 0008_order_queue
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_price_rollups'
+down_revision = '0008_order_queue'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'price_rollups',
+        sa.Column('company_id', postgresql.UUID(), nullable=False),
+        sa.Column('resolution', sa.String(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('first_day', sa.BigInteger(), nullable=False),
+        sa.Column('last_day', sa.BigInteger(), nullable=False),
+        sa.Column('open', sa.Numeric(), nullable=False),
+        sa.Column('high', sa.Numeric(), nullable=False),
+        sa.Column('low', sa.Numeric(), nullable=False),
+        sa.Column('close', sa.Numeric(), nullable=False),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id', 'resolution', 'period_start')
+    )
+    op.create_table(
+        'company_stats',
+        sa.Column('company_id', postgresql.UUID(), nullable=False),
+        sa.Column('day', sa.BigInteger(), nullable=False),
+        sa.Column('ma7', sa.Numeric(), nullable=True),
+        sa.Column('ma30', sa.Numeric(), nullable=True),
+        sa.Column('high_52w', sa.Numeric(), nullable=True),
+        sa.Column('low_52w', sa.Numeric(), nullable=True),
+        sa.Column('volatility_30d', sa.Numeric(), nullable=True),
+        sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('company_id')
+    )
+    for resolution, period in (
+        ('weekly', "DATE '2025-09-01' + (day / 7 * 7)::integer"),
+        ('monthly', "date_trunc('month', DATE '2025-09-01' + day::integer)::date")
+    ):
+        op.execute(f"""
+            INSERT INTO price_rollups (company_id, resolution, period_start, first_day, last_day, open, high, low, close)
+            SELECT company_id, '{resolution}', {period}, min(day), max(day),
+                   (array_agg(price ORDER BY day ASC))[1], max(price), min(price),
+                   (array_agg(price ORDER BY day DESC))[1]
+            FROM share_prices
+            GROUP BY company_id, {period}
+        """)
+
+
+def downgrade():
+    op.drop_table('company_stats')
+    op.drop_table('price_rollups')
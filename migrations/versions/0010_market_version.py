@@ -0,0 +1,24 @@
+"""sequence bumped after every market write, used to key cached responses
+
+Revision ID: 0010_market_version
+Revises: 0009_price_rollups
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010_market_version'
+down_revision = '0009_price_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(sa.schema.CreateSequence(sa.Sequence('market_version_seq')))
+
+
+def downgrade():
+    op.execute(sa.schema.DropSequence(sa.Sequence('market_version_seq')))
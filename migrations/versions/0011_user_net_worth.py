@@ -0,0 +1,37 @@
+"""stored share value per user and net worth index for the leaderboard
+
+Revision ID: 0011_user_net_worth
+Revises: 0010_market_version
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_user_net_worth'
+down_revision = '0010_market_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('in_shares', sa.Numeric(), server_default='0', nullable=False))
+    op.execute("""
+        UPDATE users SET in_shares = holdings.value
+        FROM (
+            SELECT ownerships.user_id, sum(ownerships.shares_owned * companies.latest_price) AS value
+            FROM ownerships
+            JOIN companies ON companies.id = ownerships.company_id
+            WHERE companies.latest_price IS NOT NULL
+            GROUP BY ownerships.user_id
+        ) AS holdings
+        WHERE holdings.user_id = users.id
+    """)
+    op.create_index('ix_users_net_worth', 'users', [sa.text('(balance + in_shares) DESC'), 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_users_net_worth', table_name='users')
+    op.drop_column('users', 'in_shares')
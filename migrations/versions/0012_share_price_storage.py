@@ -0,0 +1,40 @@
+"""compact (company_id, day) key and fixed-precision prices for share prices
+
+Revision ID: 0012_share_price_storage
+Revises: 0011_user_net_worth
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_share_price_storage'
+down_revision = '0011_user_net_worth'
+branch_labels = None
+depends_on = None
+
+ROLLUP_PRICES = ('open', 'high', 'low', 'close')
+
+
+def upgrade():
+    op.drop_index('ix_share_prices_company_day', table_name='share_prices')
+    op.drop_constraint('share_prices_pkey', 'share_prices', type_='primary')
+    op.drop_column('share_prices', 'id')
+    op.create_primary_key('share_prices_pkey', 'share_prices', ['company_id', 'day'])
+    op.alter_column('share_prices', 'price', type_=sa.Numeric(12, 2), postgresql_using='round(price, 2)')
+    for column in ROLLUP_PRICES:
+        op.alter_column('price_rollups', column, type_=sa.Numeric(12, 2), postgresql_using=f'round({column}, 2)')
+
+
+def downgrade():
+    for column in ROLLUP_PRICES:
+        op.alter_column('price_rollups', column, type_=sa.Numeric())
+    op.alter_column('share_prices', 'price', type_=sa.Numeric())
+    op.drop_constraint('share_prices_pkey', 'share_prices', type_='primary')
+    op.add_column('share_prices', sa.Column('id', postgresql.UUID(as_uuid=True), server_default=sa.text('gen_random_uuid()'), nullable=False))
+    op.alter_column('share_prices', 'id', server_default=None)
+    op.create_primary_key('share_prices_pkey', 'share_prices', ['id'])
+    op.create_index('ix_share_prices_company_day', 'share_prices', ['company_id', sa.text('day DESC')], unique=True)
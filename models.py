@@ -1,29 +1,74 @@
 import uuid
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import ForeignKey
-from sqlalchemy.types import BigInteger, Numeric, String
+from sqlalchemy import DDL, Computed, ForeignKey, Index, Sequence, UniqueConstraint, event, func
+from sqlalchemy.types import BigInteger, Date, DateTime, Numeric, String, Text
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
+event.listen(db.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
 
 class Word(db.Model):
     __tablename__ = "words"
+    __table_args__ = (
+        Index("ix_words_word_lower", func.lower(db.text("word"))),
+        Index("ix_words_word_trgm", db.text("lower(word) gin_trgm_ops"), postgresql_using="gin"),
+        Index("ix_words_search_text_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     word = db.Column(String, nullable=False)
     meaning = db.Column(JSONB, nullable=False)
     type = db.Column(String, nullable=False)
     phonetic = db.Column(String, nullable=False)
     combination = db.Column(JSONB, nullable=True)
+    search_text = db.Column(Text, Computed("lower(word || ' ' || meaning::text)", persisted=True))
+    script = db.Column(JSONB, nullable=True)
+    script_source = db.Column(Text, nullable=True)
 
 class Morpheme(db.Model):
     __tablename__ = "morphemes"
+    __table_args__ = (
+        Index("ix_morphemes_morpheme_lower", func.lower(db.text("morpheme"))),
+        Index("ix_morphemes_morpheme_trgm", db.text("lower(morpheme) gin_trgm_ops"), postgresql_using="gin"),
+        Index("ix_morphemes_search_text_trgm", "search_text", postgresql_using="gin", postgresql_ops={"search_text": "gin_trgm_ops"}),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     morpheme = db.Column(String, nullable=False)
     meaning = db.Column(JSONB, nullable=False)
     type = db.Column(String, nullable=False)
     phonetic = db.Column(String, nullable=False)
     changes = db.Column(JSONB, nullable=True)
+    search_text = db.Column(Text, Computed("lower(morpheme || ' ' || meaning::text)", persisted=True))
+    script = db.Column(JSONB, nullable=True)
+    script_source = db.Column(Text, nullable=True)
+
+class LexiconVersion(db.Model):
+    __tablename__ = "lexicon_version"
+    id = db.Column(BigInteger, primary_key=True)
+    version = db.Column(BigInteger, nullable=False, default=0)
+
+marketVersion = Sequence("market_version_seq", metadata=db.metadata)
+
+LEXICON_VERSION_DDL = """
+INSERT INTO lexicon_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_lexicon_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE lexicon_version SET version = version + 1 WHERE id = 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER words_lexicon_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON words
+FOR EACH STATEMENT EXECUTE FUNCTION bump_lexicon_version();
+
+CREATE OR REPLACE TRIGGER morphemes_lexicon_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON morphemes
+FOR EACH STATEMENT EXECUTE FUNCTION bump_lexicon_version();
+"""
+
+event.listen(db.metadata, "after_create", DDL(LEXICON_VERSION_DDL).execute_if(dialect="postgresql"))
 
 class Company(db.Model):
     __tablename__ = "companies"
@@ -35,12 +80,19 @@ class Company(db.Model):
     insider_shares = db.Column(BigInteger, nullable=False)
     gov_shares = db.Column(BigInteger, nullable=False)
     dividends = db.Column(Numeric, nullable=False, default=0)
+    latest_price = db.Column(Numeric, nullable=True)
+    previous_price = db.Column(Numeric, nullable=True)
+    latest_day = db.Column(BigInteger, nullable=True)
 
     share_prices = db.relationship("SharePrice", back_populates="company", cascade="all, delete-orphan")
     ownerships = db.relationship("Ownership", back_populates="company", cascade="all, delete-orphan")
 
 class Ownership(db.Model):
     __tablename__ = "ownerships"
+    __table_args__ = (
+        UniqueConstraint("user_id", "company_id", name="uq_ownerships_user_company"),
+        Index("ix_ownerships_company_id", "company_id"),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = db.Column(UUID, ForeignKey("companies.id"), nullable=False)
     user_id = db.Column(UUID, ForeignKey("users.id"), nullable=False)
@@ -52,15 +104,52 @@ class Ownership(db.Model):
 
 class SharePrice(db.Model):
     __tablename__ = "share_prices"
-    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    company_id = db.Column(UUID, ForeignKey("companies.id"), nullable=False)
-    day = db.Column(BigInteger, nullable=False)
-    price = db.Column(Numeric, nullable=False)
+    company_id = db.Column(UUID, ForeignKey("companies.id"), primary_key=True)
+    day = db.Column(BigInteger, primary_key=True)
+    price = db.Column(Numeric(12, 2), nullable=False)
 
     company = db.relationship("Company", back_populates="share_prices")
 
+class PriceRollup(db.Model):
+    __tablename__ = "price_rollups"
+    company_id = db.Column(UUID, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    resolution = db.Column(String, primary_key=True)
+    period_start = db.Column(Date, primary_key=True)
+    first_day = db.Column(BigInteger, nullable=False)
+    last_day = db.Column(BigInteger, nullable=False)
+    open = db.Column(Numeric(12, 2), nullable=False)
+    high = db.Column(Numeric(12, 2), nullable=False)
+    low = db.Column(Numeric(12, 2), nullable=False)
+    close = db.Column(Numeric(12, 2), nullable=False)
+
+class CompanyStats(db.Model):
+    __tablename__ = "company_stats"
+    company_id = db.Column(UUID, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    day = db.Column(BigInteger, nullable=False)
+    ma7 = db.Column(Numeric, nullable=True)
+    ma30 = db.Column(Numeric, nullable=True)
+    high_52w = db.Column(Numeric, nullable=True)
+    low_52w = db.Column(Numeric, nullable=True)
+    volatility_30d = db.Column(Numeric, nullable=True)
+
+class QueuedOrder(db.Model):
+    __tablename__ = "order_queue"
+    __table_args__ = (
+        Index("ix_order_queue_pending", "created_at", postgresql_where=db.text("status = 'pending'")),
+    )
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = db.Column(UUID, ForeignKey("users.id"), nullable=False)
+    legs = db.Column(JSONB, nullable=False)
+    status = db.Column(String, nullable=False, default="pending")
+    result = db.Column(JSONB, nullable=True)
+    created_at = db.Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    processed_at = db.Column(DateTime(timezone=True), nullable=True)
+
 class User(db.Model):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_net_worth", db.text("(balance + in_shares) DESC"), "id"),
+    )
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = db.Column(String, nullable=True)
     username = db.Column(String, nullable=False, unique=True)
@@ -68,6 +157,8 @@ class User(db.Model):
     own_company = db.Column(String, nullable=True)
     color = db.Column(String, nullable=False)
     balance = db.Column(Numeric, nullable=False, default=0)
+    version = db.Column(BigInteger, nullable=False, default=0, server_default="0")
+    in_shares = db.Column(Numeric, nullable=False, default=0, server_default="0")
 
     ownerships = db.relationship("Ownership", back_populates="user")
 
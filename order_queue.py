@@ -0,0 +1,168 @@
+import time, datetime
+from flask import current_app
+from sqlalchemy import bindparam, delete, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from models import db, Ownership, QueuedOrder, User
+from orders import OrderError, parse_leg, price_legs, read_quotes, sell_leg
+from quotes import get_current_day, bump_market_version
+
+WORKER_LOCK_KEY = 727001
+
+def enqueue(user_id, legs):
+    order = QueuedOrder(
+        user_id=user_id,
+        legs=[{**leg, "company_id": str(leg["company_id"])} for leg in legs],
+        status="pending"
+    )
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+def describe(order):
+    return {
+        "id": str(order.id),
+        "status": order.status,
+        "legs": order.legs,
+        "result": order.result,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "processed_at": order.processed_at.isoformat() if order.processed_at else None
+    }
+
+def lock_accounts(user_ids):
+    balances = {
+        str(user_id): balance
+        for user_id, balance in db.session.execute(
+            select(User.id, User.balance).where(User.id.in_(user_ids)).order_by(User.id).with_for_update()
+        )
+    }
+    holdings = {
+        (str(user_id), str(company_id)): shares
+        for user_id, company_id, shares in db.session.execute(
+            select(Ownership.user_id, Ownership.company_id, Ownership.shares_owned)
+            .where(Ownership.user_id.in_(user_ids))
+            .order_by(Ownership.id)
+            .with_for_update()
+        )
+    }
+    return balances, holdings
+
+def fill(userKey, legs, quotes, balances, holdings):
+    results, cash, deltas = price_legs(legs, quotes)
+    balance = balances.get(userKey)
+    if balance is None or balance + cash < 0:
+        raise OrderError("Insufficient balance")
+    for company_id, delta in sorted(deltas.items(), key=lambda item: str(item[0])):
+        if holdings.get((userKey, str(company_id)), 0) + delta < 0:
+            raise OrderError("Not enough shares to sell", leg=sell_leg(results, company_id))
+
+    balances[userKey] = balance + cash
+    for company_id, delta in deltas.items():
+        key = (userKey, str(company_id))
+        holdings[key] = holdings.get(key, 0) + delta
+    return results, cash, deltas
+
+def write_fills(cash, deltas):
+    users = User.__table__
+    db.session.execute(
+        users.update()
+        .where(users.c.id == bindparam("user_id"))
+        .values(balance=users.c.balance + bindparam("cash"), in_shares=users.c.in_shares - bindparam("cash"), version=users.c.version + 1),
+        [{"user_id": user_id, "cash": amount} for user_id, amount in cash.items()]
+    )
+
+    day = get_current_day()
+    rows = [{"user_id": user_id, "company_id": company_id, "week": day, "shares_owned": delta} for (user_id, company_id), delta in deltas.items() if delta]
+    if rows:
+        statement = insert(Ownership)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[Ownership.user_id, Ownership.company_id],
+            set_={"shares_owned": Ownership.shares_owned + statement.excluded.shares_owned}
+        ), rows)
+        db.session.execute(delete(Ownership).where(Ownership.user_id.in_(list(cash)), Ownership.shares_owned == 0))
+
+def drain_once(batch_size):
+    orders = db.session.execute(
+        select(QueuedOrder)
+        .where(QueuedOrder.status == "pending")
+        .order_by(QueuedOrder.created_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not orders:
+        db.session.rollback()
+        return {"processed": 0}
+
+    parsed = {}
+    outcomes = []
+    for order in orders:
+        try:
+            parsed[order.id] = [parse_leg(leg, i) for i, leg in enumerate(order.legs)]
+        except OrderError as e:
+            outcomes.append({"order_id": order.id, "new_status": "rejected", "new_result": {"error": e.message, "leg": e.leg}})
+
+    quotes = read_quotes({leg["company_id"] for legs in parsed.values() for leg in legs})
+    balances, holdings = lock_accounts({order.user_id for order in orders if order.id in parsed})
+    cash = {}
+    deltas = {}
+    for order in orders:
+        if order.id not in parsed:
+            continue
+        userKey = str(order.user_id)
+        try:
+            results, orderCash, orderDeltas = fill(userKey, parsed[order.id], quotes, balances, holdings)
+        except OrderError as e:
+            outcomes.append({"order_id": order.id, "new_status": "rejected", "new_result": {"error": e.message, "leg": e.leg}})
+            continue
+
+        cash[userKey] = cash.get(userKey, 0) + orderCash
+        for company_id, delta in orderDeltas.items():
+            key = (userKey, str(company_id))
+            deltas[key] = deltas.get(key, 0) + delta
+        outcomes.append({"order_id": order.id, "new_status": "filled", "new_result": {"results": results, "balance": float(balances[userKey])}})
+
+    if cash:
+        write_fills(cash, deltas)
+
+    table = QueuedOrder.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == bindparam("order_id"))
+        .values(status=bindparam("new_status"), result=bindparam("new_result"), processed_at=datetime.datetime.now(datetime.timezone.utc)),
+        outcomes
+    )
+    db.session.commit()
+    bump_market_version()
+
+    return {
+        "processed": len(outcomes),
+        "filled": sum(1 for o in outcomes if o["new_status"] == "filled"),
+        "rejected": sum(1 for o in outcomes if o["new_status"] == "rejected")
+    }
+
+def run_worker(batch_size, interval, once=False):
+    with db.engine.connect() as lockConnection:
+        if not lockConnection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": WORKER_LOCK_KEY}).scalar():
+            print("Another order worker holds the queue lock; exiting.")
+            return
+
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    stats = drain_once(batch_size)
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    if once:
+                        raise
+                    current_app.logger.error("Order batch failed, retrying in %ss: %s", interval, e)
+                    time.sleep(interval)
+                    continue
+                if stats["processed"]:
+                    print(f"Processed {stats['processed']} orders ({stats['filled']} filled, {stats['rejected']} rejected) in {round((time.perf_counter() - started) * 1000, 2)} ms.")
+                if once and not stats["processed"]:
+                    return
+                if not stats["processed"]:
+                    time.sleep(interval)
+        finally:
+            lockConnection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": WORKER_LOCK_KEY})
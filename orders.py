@@ -0,0 +1,144 @@
+import uuid
+from decimal import Decimal
+from sqlalchemy import and_, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from models import db, Company, Ownership, User
+from quotes import get_current_day, bump_market_version
+
+MAX_ORDER_LEGS = 100
+SIDES = ("buy", "sell")
+
+class OrderError(Exception):
+    def __init__(self, message, status=400, leg=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.leg = leg
+
+def parse_leg(leg, index=None):
+    if not isinstance(leg, dict):
+        raise OrderError("Invalid order", leg=index)
+
+    side = leg.get("side")
+    if side not in SIDES:
+        raise OrderError("Invalid order side", leg=index)
+
+    shares = leg.get("shares", 0)
+    if not isinstance(shares, int) or isinstance(shares, bool) or shares <= 0:
+        raise OrderError("Invalid number of shares", leg=index)
+
+    try:
+        company_id = uuid.UUID(str(leg.get("company_id")))
+    except ValueError:
+        raise OrderError("Company not found", 404, leg=index)
+
+    return {"side": side, "company_id": company_id, "shares": shares}
+
+def read_quotes(company_ids):
+    rows = db.session.execute(
+        select(Company.id, Company.name, Company.latest_price).where(Company.id.in_(company_ids))
+    )
+    return {row.id: row for row in rows}
+
+def holding_filter(user_id, company_id, shares=None):
+    condition = and_(Ownership.user_id == user_id, Ownership.company_id == company_id)
+    if shares is not None:
+        condition = and_(condition, Ownership.shares_owned >= shares)
+    return condition
+
+def settle(user_id, cash):
+    return db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.balance + cash >= 0)
+        .values(balance=User.balance + cash, in_shares=User.in_shares - cash, version=User.version + 1)
+        .returning(User.balance)
+    ).scalar()
+
+def add_shares(user_id, company_id, shares, day):
+    statement = insert(Ownership).values(
+        company_id=company_id,
+        user_id=user_id,
+        week=day,
+        shares_owned=shares
+    )
+    db.session.execute(statement.on_conflict_do_update(
+        index_elements=[Ownership.user_id, Ownership.company_id],
+        set_={"shares_owned": Ownership.shares_owned + statement.excluded.shares_owned}
+    ))
+
+def remove_shares(user_id, company_id, shares):
+    return db.session.execute(
+        update(Ownership)
+        .where(holding_filter(user_id, company_id, shares))
+        .values(shares_owned=Ownership.shares_owned - shares)
+        .returning(Ownership.shares_owned)
+    ).scalar()
+
+def price_legs(legs, quotes):
+    results = []
+    cash = Decimal(0)
+    deltas = {}
+
+    for index, leg in enumerate(legs):
+        quote = quotes.get(leg["company_id"])
+        if quote is None:
+            raise OrderError("Company not found", 404, leg=index)
+        if quote.latest_price is None:
+            raise OrderError("Company has no price yet", leg=index)
+
+        price = Decimal(quote.latest_price)
+        amount = price * leg["shares"]
+        signed = leg["shares"] if leg["side"] == "buy" else -leg["shares"]
+        cash += -amount if leg["side"] == "buy" else amount
+        deltas[quote.id] = deltas.get(quote.id, 0) + signed
+        results.append({
+            "side": leg["side"],
+            "company_id": str(quote.id),
+            "company": quote.name,
+            "shares": leg["shares"],
+            "price": float(price),
+            "amount": float(amount)
+        })
+
+    return results, cash, deltas
+
+def sell_leg(results, company_id):
+    return next(i for i, r in enumerate(results) if r["company_id"] == str(company_id) and r["side"] == "sell")
+
+def apply_orders(user_id, legs):
+    results, cash, deltas = price_legs(legs, read_quotes({leg["company_id"] for leg in legs}))
+    balance = settle(user_id, cash)
+    if balance is None:
+        raise OrderError("Insufficient balance")
+
+    day = get_current_day()
+    emptied = False
+    for company_id in sorted(deltas, key=str):
+        delta = deltas[company_id]
+        if delta > 0:
+            add_shares(user_id, company_id, delta, day)
+        elif delta < 0:
+            remaining = remove_shares(user_id, company_id, -delta)
+            if remaining is None:
+                raise OrderError("Not enough shares to sell", leg=sell_leg(results, company_id))
+            emptied = emptied or remaining == 0
+
+    if emptied:
+        db.session.execute(delete(Ownership).where(Ownership.user_id == user_id, Ownership.shares_owned == 0))
+
+    return results, balance
+
+def execute_orders(user_id, legs):
+    try:
+        results, balance = apply_orders(user_id, legs)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    bump_market_version()
+
+    return {"results": results, "balance": float(balance)}
+
+def execute_order(user_id, side, company_id, shares):
+    execution = execute_orders(user_id, [parse_leg({"side": side, "company_id": company_id, "shares": shares})])
+    return {"company": execution["results"][0]["company"], "price": execution["results"][0]["price"], "balance": execution["balance"]}
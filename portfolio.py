@@ -0,0 +1,106 @@
+from sqlalchemy import func, select, true, update
+from sqlalchemy.orm import joinedload
+from models import db, Company, Ownership, SharePrice, User
+
+def ranked_prices(depth, company_ids=None):
+    ranked = select(
+        SharePrice.company_id,
+        SharePrice.day,
+        SharePrice.price,
+        func.row_number().over(
+            partition_by=SharePrice.company_id,
+            order_by=SharePrice.day.desc()
+        ).label("rank")
+    )
+    if company_ids is not None:
+        ranked = ranked.where(SharePrice.company_id.in_(company_ids))
+    ranked = ranked.subquery()
+
+    return select(ranked.c.company_id, ranked.c.day, ranked.c.price, ranked.c.rank).where(ranked.c.rank <= depth)
+
+def latest_prices(days, company_id):
+    return (
+        select(SharePrice.day, SharePrice.price)
+        .where(SharePrice.company_id == company_id)
+        .order_by(SharePrice.day.desc())
+        .limit(days)
+    )
+
+def recent_prices(days, company_ids=None):
+    latest = latest_prices(days, Company.id).lateral()
+    query = select(Company.id, latest.c.day, latest.c.price).join(latest, true())
+    if company_ids is not None:
+        query = query.where(Company.id.in_(company_ids))
+
+    history = {}
+    for company_id, day, price in db.session.execute(query.order_by(Company.id, latest.c.day)):
+        history.setdefault(str(company_id), []).append((day, float(price)))
+
+    return history
+
+def company_holders(company_ids=None):
+    query = Ownership.query.options(joinedload(Ownership.user))
+    if company_ids is not None:
+        query = query.filter(Ownership.company_id.in_(company_ids))
+
+    holders = {}
+    for own in query.all():
+        holders.setdefault(str(own.company_id), []).append(own)
+
+    return holders
+
+def net_worth():
+    return User.balance + User.in_shares
+
+def refresh_net_worth():
+    value = (
+        select(func.coalesce(func.sum(Ownership.shares_owned * Company.latest_price), 0))
+        .join(Company, Company.id == Ownership.company_id)
+        .where(Ownership.user_id == User.id)
+        .scalar_subquery()
+    )
+
+    return db.session.execute(
+        update(User).values(in_shares=value).where(User.in_shares.is_distinct_from(value))
+    ).rowcount
+
+def leaderboard(limit, offset=0):
+    query = (
+        select(User.id, User.username, User.name, User.color, User.own_company, User.balance, User.in_shares)
+        .order_by(net_worth().desc(), User.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+    return [{
+        "rank": offset + index + 1,
+        "id": user_id,
+        "username": username,
+        "name": name,
+        "color": color,
+        "own_company": own_company,
+        "balance": balance,
+        "in_shares": in_shares,
+        "net_worth": balance + in_shares
+    } for index, (user_id, username, name, color, own_company, balance, in_shares) in enumerate(db.session.execute(query))]
+
+def user_rank(user):
+    worth = user.balance + user.in_shares
+    return db.session.query(func.count(User.id)).filter(
+        (net_worth() > worth) | ((net_worth() == worth) & (User.id < user.id))
+    ).scalar() + 1
+
+def user_holdings(user_id):
+    query = (
+        select(Company.name, Company.code, Ownership.shares_owned, Company.latest_price)
+        .select_from(Ownership)
+        .join(Company, Company.id == Ownership.company_id)
+        .where(Ownership.user_id == user_id)
+    )
+
+    return [{
+        "company": name,
+        "code": code,
+        "shares_owned": shares_owned,
+        "current_value": shares_owned * (float(price) if price is not None else 0)
+    } for name, code, shares_owned, price in db.session.execute(query)]
@@ -0,0 +1,87 @@
+import re
+from sqlalchemy import delete, func, select, text
+from models import db, Company, SharePrice
+from rollups import STATS_WINDOW, rebuild_rollups
+from quotes import bump_market_version
+
+PRICE_RETENTION_DAYS = 730
+MIN_RETENTION_DAYS = 3 * STATS_WINDOW
+PARTITION_DAYS = 364
+PARTITION_NAME = re.compile(r"^share_prices_d(\d+)_(\d+)$")
+
+PARTITIONED_TABLE = """
+CREATE TABLE share_prices (
+    company_id UUID NOT NULL REFERENCES companies (id),
+    day BIGINT NOT NULL,
+    price NUMERIC(12, 2) NOT NULL,
+    CONSTRAINT share_prices_pkey PRIMARY KEY (company_id, day)
+) PARTITION BY RANGE (day)
+"""
+
+def is_partitioned():
+    return db.session.execute(text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'share_prices'::regclass")).scalar()
+
+def price_partitions():
+    names = db.session.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'share_prices'::regclass
+    """)).scalars()
+    return sorted((int(match.group(1)), int(match.group(2)), match.group(0)) for match in map(PARTITION_NAME.match, names) if match)
+
+def create_partition(start, end):
+    db.session.execute(text(f"CREATE TABLE share_prices_d{start}_{end} PARTITION OF share_prices FOR VALUES FROM ({start}) TO ({end})"))
+
+def ensure_price_partitions(day):
+    if not is_partitioned():
+        return 0
+
+    start, end, name = price_partitions()[-1]
+    size = end - start
+    created = 0
+    while end <= day:
+        create_partition(end, end + size)
+        end += size
+        created += 1
+    return created
+
+def partition_prices(size=PARTITION_DAYS):
+    if is_partitioned():
+        return 0
+
+    db.session.execute(text("LOCK TABLE share_prices IN ACCESS EXCLUSIVE MODE"))
+    first, last = db.session.execute(select(func.min(SharePrice.day), func.max(SharePrice.day))).one()
+    db.session.execute(text("ALTER TABLE share_prices RENAME TO share_prices_unpartitioned"))
+    db.session.execute(text("ALTER TABLE share_prices_unpartitioned RENAME CONSTRAINT share_prices_pkey TO share_prices_unpartitioned_pkey"))
+    db.session.execute(text(PARTITIONED_TABLE))
+
+    start = (first or 0) // size * size
+    created = 0
+    while created == 0 or start <= (last or 0):
+        create_partition(start, start + size)
+        start += size
+        created += 1
+
+    db.session.execute(text("INSERT INTO share_prices (company_id, day, price) SELECT company_id, day, price FROM share_prices_unpartitioned"))
+    db.session.execute(text("DROP TABLE share_prices_unpartitioned"))
+    db.session.commit()
+    return created
+
+def compact_prices(retention_days=PRICE_RETENTION_DAYS):
+    latest = db.session.execute(select(func.max(Company.latest_day))).scalar()
+    cutoff = max((latest - retention_days) // 7 * 7, 0) if latest is not None else 0
+    stats = {"cutoff_day": cutoff, "rollups": 0, "partitions_dropped": 0, "prices_deleted": 0}
+    if cutoff == 0:
+        return stats
+
+    stats["rollups"] = rebuild_rollups(to_day=cutoff - 1)
+    if is_partitioned():
+        for start, end, name in price_partitions():
+            if end <= cutoff:
+                db.session.execute(text(f"DROP TABLE {name}"))
+                stats["partitions_dropped"] += 1
+    stats["prices_deleted"] = db.session.execute(delete(SharePrice).where(SharePrice.day < cutoff)).rowcount
+
+    db.session.commit()
+    bump_market_version()
+    return stats
@@ -0,0 +1,129 @@
+import time, random, threading
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RouteMetrics:
+    def __init__(self):
+        self.routes = {}
+        self.n_plus_one = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, seconds, dbSeconds, queries):
+        with self._lock:
+            entry = self.routes.get((route, method, status))
+            if entry is None:
+                entry = self.routes[(route, method, status)] = {
+                    "count": 0, "seconds": 0.0, "db_seconds": 0.0, "queries": 0, "buckets": [0] * len(DURATION_BUCKETS)
+                }
+            entry["count"] += 1
+            entry["seconds"] += seconds
+            entry["db_seconds"] += dbSeconds
+            entry["queries"] += queries
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    entry["buckets"][index] += 1
+
+    def flag_n_plus_one(self, route):
+        with self._lock:
+            self.n_plus_one[route] += 1
+
+    def prometheus(self):
+        with self._lock:
+            routes = {key: {**entry, "buckets": list(entry["buckets"])} for key, entry in self.routes.items()}
+            repeated = dict(self.n_plus_one)
+
+        lines = [
+            "# HELP lutinex_request_duration_seconds Sampled request duration by route.",
+            "# TYPE lutinex_request_duration_seconds histogram"
+        ]
+        for (route, method, status), entry in sorted(routes.items()):
+            labels = f'route="{escape(route)}",method="{method}",status="{status}"'
+            for bound, count in zip(DURATION_BUCKETS, entry["buckets"]):
+                lines.append(f'lutinex_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'lutinex_request_duration_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+            lines.append(f"lutinex_request_duration_seconds_sum{{{labels}}} {entry['seconds']:.6f}")
+            lines.append(f"lutinex_request_duration_seconds_count{{{labels}}} {entry['count']}")
+
+        for name, field, help_ in (
+            ("lutinex_request_db_seconds_total", "db_seconds", "Time spent in SQL statements by sampled requests."),
+            ("lutinex_request_queries_total", "queries", "SQL statements executed by sampled requests.")
+        ):
+            lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+            for (route, method, status), entry in sorted(routes.items()):
+                lines.append(f'{name}{{route="{escape(route)}",method="{method}",status="{status}"}} {entry[field]}')
+
+        lines += [
+            "# HELP lutinex_n_plus_one_total Sampled requests that repeated one statement past the threshold.",
+            "# TYPE lutinex_n_plus_one_total counter"
+        ]
+        for route, count in sorted(repeated.items()):
+            lines.append(f'lutinex_n_plus_one_total{{route="{escape(route)}"}} {count}')
+
+        return lines
+
+routeMetrics = RouteMetrics()
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def gauges(prefix, values):
+    lines = []
+    for field, value in sorted(values.items()):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines += [f"# TYPE {prefix}_{field} gauge", f"{prefix}_{field} {value}"]
+    return lines
+
+@event.listens_for(Engine, "before_cursor_execute")
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and g.get("profile") is not None:
+        context._profile_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_profile_started", None)
+    if started is None or not has_request_context() or g.get("profile") is None:
+        return
+
+    profile = g.profile
+    profile["db_seconds"] += time.perf_counter() - started
+    profile["queries"] += 1
+    profile["statements"][statement] += 1
+
+def start_profile():
+    g.profile = None
+    if random.random() < current_app.config["PROFILE_SAMPLE_RATE"]:
+        g.profile = {"started": time.perf_counter(), "db_seconds": 0.0, "queries": 0, "statements": Counter()}
+
+def finish_profile(response):
+    profile = g.get("profile")
+    if profile is None:
+        return response
+
+    total = time.perf_counter() - profile["started"]
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    routeMetrics.observe(route, request.method, str(response.status_code), total, profile["db_seconds"], profile["queries"])
+
+    threshold = current_app.config["N_PLUS_ONE_THRESHOLD"]
+    repeated = [(count, statement) for statement, count in profile["statements"].items() if count >= threshold]
+    if repeated:
+        routeMetrics.flag_n_plus_one(route)
+        for count, statement in repeated:
+            current_app.logger.warning("Possible N+1 on %s %s: %d x %s", request.method, route, count, " ".join(statement.split())[:200])
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={profile["db_seconds"] * 1000:.2f};desc="{profile["queries"]} queries", '
+        f"app;dur={(total - profile['db_seconds']) * 1000:.2f}, "
+        f"total;dur={total * 1000:.2f}"
+    )
+    return response
+
+def init_profiling(app):
+    app.config.setdefault("PROFILE_SAMPLE_RATE", 0.0)
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", 10)
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
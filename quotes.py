@@ -0,0 +1,64 @@
+import os
+from sqlalchemy import func, select, text, update
+from models import db, Company, marketVersion
+from cache import TTLCache
+from portfolio import ranked_prices, refresh_net_worth
+
+quoteCache = TTLCache(maxsize=1, ttl=float(os.environ.get("QUOTE_CACHE_TTL", 5)))
+
+def load_quotes():
+    rows = db.session.execute(
+        select(Company.id, Company.latest_price, Company.previous_price, Company.latest_day)
+    )
+
+    return {
+        str(company_id): (
+            float(latest) if latest is not None else 0.0,
+            float(previous) if previous is not None else 0.0,
+            day
+        )
+        for company_id, latest, previous, day in rows
+    }
+
+def all_quotes():
+    return quoteCache.get_or_load("quotes", load_quotes)
+
+def get_quote(company_id):
+    return all_quotes().get(str(company_id), (0.0, 0.0, None))
+
+def get_current_day():
+    days = [day for latest, previous, day in all_quotes().values() if day is not None]
+    return max(days) if days else 0
+
+def invalidate_quotes():
+    quoteCache.clear()
+
+def market_version():
+    return db.session.execute(text(f"SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM {marketVersion.name}")).scalar()
+
+def bump_market_version():
+    db.session.execute(select(marketVersion.next_value()))
+
+def quote_values(company_ids=None):
+    current = ranked_prices(1, company_ids).subquery()
+    previous = ranked_prices(2, company_ids).subquery()
+    return {
+        "latest_price": select(current.c.price).where(current.c.company_id == Company.id).scalar_subquery(),
+        "latest_day": select(current.c.day).where(current.c.company_id == Company.id).scalar_subquery(),
+        "previous_price": select(previous.c.price).where(previous.c.company_id == Company.id, previous.c.rank == 2).scalar_subquery()
+    }
+
+def fill_missing_quotes():
+    missing = db.session.execute(select(Company.id).where(Company.latest_day.is_(None))).scalars().all()
+    if missing:
+        db.session.execute(update(Company).where(Company.id.in_(missing)).values(**quote_values(missing)))
+    return len(missing)
+
+def refresh_quotes():
+    db.session.execute(update(Company).values(**quote_values()))
+    refresh_net_worth()
+    db.session.commit()
+    invalidate_quotes()
+    bump_market_version()
+
+    return db.session.query(func.count(Company.id)).filter(Company.latest_day.isnot(None)).scalar()
@@ -0,0 +1,116 @@
+import numpy as np
+from sqlalchemy import Date, Integer, case, cast, delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from models import db, Company, CompanyStats, PriceRollup, SharePrice
+from history import START_DATE, ohlc_columns, period_expression, period_start
+from portfolio import recent_prices
+
+ROLLUP_RESOLUTIONS = ("weekly", "monthly")
+STATS_WINDOW = 30
+YEAR_WEEKS = 52
+STATS_FIELDS = ("ma7", "ma30", "high_52w", "low_52w", "volatility_30d")
+
+def merge_rollups(statement):
+    current = PriceRollup.__table__.c
+    return statement.on_conflict_do_update(
+        index_elements=[current.company_id, current.resolution, current.period_start],
+        set_={
+            "first_day": func.least(current.first_day, statement.excluded.first_day),
+            "last_day": func.greatest(current.last_day, statement.excluded.last_day),
+            "open": case((statement.excluded.first_day < current.first_day, statement.excluded.open), else_=current.open),
+            "high": func.greatest(current.high, statement.excluded.high),
+            "low": func.least(current.low, statement.excluded.low),
+            "close": case((statement.excluded.last_day > current.last_day, statement.excluded.close), else_=current.close)
+        }
+    )
+
+def add_rollup_prices(prices):
+    if not prices:
+        return 0
+
+    rows = [{
+        "company_id": p["company_id"],
+        "resolution": resolution,
+        "period_start": period_start(resolution, p["day"]),
+        "first_day": p["day"],
+        "last_day": p["day"],
+        "open": p["price"],
+        "high": p["price"],
+        "low": p["price"],
+        "close": p["price"]
+    } for p in prices for resolution in ROLLUP_RESOLUTIONS]
+    db.session.execute(merge_rollups(insert(PriceRollup)), rows)
+    return len(rows)
+
+def rebuild_rollups(from_day=None, to_day=None):
+    if from_day is None and to_day is None:
+        oldest = select(func.min(SharePrice.day)).where(SharePrice.company_id == PriceRollup.company_id).scalar_subquery()
+        db.session.execute(delete(PriceRollup).where(PriceRollup.first_day >= oldest))
+
+    written = 0
+    for resolution in ROLLUP_RESOLUTIONS:
+        period = period_expression(resolution)
+        query = select(SharePrice.company_id, literal(resolution), period, *ohlc_columns()).group_by(SharePrice.company_id, period)
+        if from_day is not None:
+            query = query.where(SharePrice.day >= from_day)
+        if to_day is not None:
+            query = query.where(SharePrice.day <= to_day)
+        written += db.session.execute(merge_rollups(insert(PriceRollup).from_select(
+            ["company_id", "resolution", "period_start", "first_day", "last_day", "open", "high", "low", "close"],
+            query
+        ))).rowcount
+
+    return written
+
+def yearly_ranges(company_ids=None):
+    weekStart = cast(literal(START_DATE.date()), Date) + cast((Company.latest_day // 7 - (YEAR_WEEKS - 1)) * 7, Integer)
+    query = (
+        select(PriceRollup.company_id, func.max(PriceRollup.high), func.min(PriceRollup.low))
+        .join(Company, Company.id == PriceRollup.company_id)
+        .where(PriceRollup.resolution == "weekly", PriceRollup.period_start >= weekStart)
+        .group_by(PriceRollup.company_id)
+    )
+    if company_ids is not None:
+        query = query.where(PriceRollup.company_id.in_(company_ids))
+
+    return {str(company_id): (high, low) for company_id, high, low in db.session.execute(query)}
+
+def window_stats(history):
+    prices = np.array([price for day, price in history])
+    returns = np.diff(prices) / prices[:-1]
+    return {
+        "ma7": round(float(prices[-7:].mean()), 4),
+        "ma30": round(float(prices[-STATS_WINDOW:].mean()), 4),
+        "volatility_30d": round(float(returns.std(ddof=1) * 100), 4) if len(returns) > 1 else None
+    }
+
+def refresh_stats(company_ids=None):
+    histories = recent_prices(STATS_WINDOW + 1, company_ids)
+    ranges = yearly_ranges(company_ids)
+
+    rows = []
+    for company_id, history in histories.items():
+        high, low = ranges.get(company_id, (None, None))
+        rows.append({"company_id": company_id, "day": history[-1][0], "high_52w": high, "low_52w": low, **window_stats(history)})
+
+    if rows:
+        statement = insert(CompanyStats)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=[CompanyStats.company_id],
+            set_={field: statement.excluded[field] for field in ("day",) + STATS_FIELDS}
+        ), rows)
+
+    return len(rows)
+
+def company_stats(company_ids=None):
+    query = select(CompanyStats)
+    if company_ids is not None:
+        query = query.where(CompanyStats.company_id.in_(company_ids))
+
+    return {
+        str(stats.company_id): {
+            "day": stats.day,
+            **{field: float(getattr(stats, field)) if getattr(stats, field) is not None else None for field in STATS_FIELDS}
+        }
+        for stats in db.session.execute(query).scalars()
+    }
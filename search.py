@@ -0,0 +1,18 @@
+from sqlalchemy import Float, case, func
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_lexicon(model, column, term):
+    term = term.lower()
+    pattern = escape_like(term)
+    form = func.lower(column)
+    rank = case(
+        (form == term, 0),
+        (form.like(f"{pattern}%", escape="\\"), 1),
+        (form.like(f"%{pattern}%", escape="\\"), 2),
+        else_=3
+    )
+    condition = model.search_text.like(f"%{pattern}%", escape="\\")
+
+    return condition, [rank, -func.similarity(form, term, type_=Float), form, model.id]
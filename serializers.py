@@ -0,0 +1,62 @@
+import operator
+from decimal import Decimal
+import orjson
+from flask.json.provider import JSONProvider
+from models import Word, Morpheme, LexiconVersion, Company, Ownership, SharePrice, PriceRollup, CompanyStats, QueuedOrder, User
+from lexicon import WORD_FIELDS, MORPHEME_FIELDS
+
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+COMPANY_FIELDS = ["id", "name", "code", "total_shares", "dividends"]
+USER_FIELDS = ["id", "username", "name", "color", "own_company", "balance"]
+
+MODEL_FIELDS = {
+    Word: WORD_FIELDS,
+    Morpheme: MORPHEME_FIELDS,
+    LexiconVersion: ["id", "version"],
+    Company: COMPANY_FIELDS,
+    Ownership: ["id", "company_id", "user_id", "week", "shares_owned"],
+    SharePrice: ["day", "price"],
+    PriceRollup: ["period_start", "first_day", "last_day", "open", "high", "low", "close"],
+    CompanyStats: ["day", "ma7", "ma30", "high_52w", "low_52w", "volatility_30d"],
+    QueuedOrder: ["id", "status", "legs", "result", "created_at", "processed_at"],
+    User: USER_FIELDS
+}
+
+def encoder(fields):
+    getter = operator.attrgetter(*fields)
+
+    def encode(row):
+        return dict(zip(fields, getter(row)))
+    return encode
+
+ENCODERS = {model: encoder(fields) for model, fields in MODEL_FIELDS.items()}
+
+encode_word = ENCODERS[Word]
+encode_morpheme = ENCODERS[Morpheme]
+encode_company = ENCODERS[Company]
+encode_stock = encoder([field for field in COMPANY_FIELDS if field != "dividends"])
+encode_user = ENCODERS[User]
+
+def default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    encode = ENCODERS.get(type(value))
+    if encode is not None:
+        return encode(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps_bytes(obj):
+    return orjson.dumps(obj, default=default, option=JSON_OPTIONS)
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        return self._app.response_class(dumps_bytes(self._prepare_response_obj(args, kwargs)), mimetype=self.mimetype)
@@ -0,0 +1,118 @@
+import os, time, hashlib, threading, jwt, requests
+from requests.adapters import HTTPAdapter
+from cache import TTLCache
+
+SUPABASE_PROJECT_ID = "sblovettyyzfrvbiroiz"
+SUPABASE_URL = os.environ.get("SUPABASE_URL", f"https://{SUPABASE_PROJECT_ID}.supabase.co")
+SUPABASE_ISSUER = f"{SUPABASE_URL}/auth/v1"
+SUPABASE_JWT_SECRET = os.environ.get("SUPABASE_JWT_SECRET")
+SUPABASE_API_KEY = os.environ.get("SUPABASE_ANON_KEY", SUPABASE_JWT_SECRET)
+SUPABASE_AUDIENCE = os.environ.get("SUPABASE_JWT_AUDIENCE", "authenticated")
+SUPABASE_TIMEOUT = (
+    float(os.environ.get("SUPABASE_CONNECT_TIMEOUT", 2)),
+    float(os.environ.get("SUPABASE_READ_TIMEOUT", 5))
+)
+
+tokenCache = TTLCache(
+    maxsize=int(os.environ.get("SUPABASE_TOKEN_CACHE_SIZE", 4096)),
+    ttl=float(os.environ.get("SUPABASE_TOKEN_CACHE_TTL", 300))
+)
+counters = {"local_verified": 0, "local_rejected": 0, "remote_calls": 0, "remote_failures": 0}
+countersLock = threading.Lock()
+
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=int(os.environ.get("SUPABASE_POOL_SIZE", 16))))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=int(os.environ.get("SUPABASE_POOL_SIZE", 16))))
+
+def count(name):
+    with countersLock:
+        counters[name] += 1
+
+def user_from_claims(claims):
+    return {
+        "id": claims.get("sub"),
+        "aud": claims.get("aud"),
+        "role": claims.get("role"),
+        "email": claims.get("email"),
+        "phone": claims.get("phone"),
+        "app_metadata": claims.get("app_metadata", {}),
+        "user_metadata": claims.get("user_metadata", {})
+    }
+
+def verify_locally(token):
+    try:
+        claims = jwt.decode(
+            token,
+            SUPABASE_JWT_SECRET,
+            algorithms=["HS256"],
+            audience=SUPABASE_AUDIENCE,
+            options={"require": ["exp", "sub"]}
+        )
+    except jwt.InvalidTokenError:
+        count("local_rejected")
+        return None, None
+
+    count("local_verified")
+    return user_from_claims(claims), claims["exp"]
+
+def fetch_remotely(token):
+    count("remote_calls")
+    try:
+        response = session.get(
+            f"{SUPABASE_URL}/auth/v1/user",
+            headers={"Authorization": f"Bearer {token}", "apikey": SUPABASE_API_KEY},
+            timeout=SUPABASE_TIMEOUT
+        )
+    except requests.RequestException:
+        count("remote_failures")
+        return None, None
+
+    if response.status_code != 200:
+        count("remote_failures")
+        return None, None
+
+    try:
+        expires = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        expires = None
+    return response.json(), expires
+
+def uses_local_secret(token):
+    if not SUPABASE_JWT_SECRET:
+        return False
+    try:
+        return jwt.get_unverified_header(token).get("alg") == "HS256"
+    except jwt.InvalidTokenError:
+        return True
+
+def get_user_info(token):
+    key = hashlib.sha256(token.encode()).hexdigest()
+    user = tokenCache.get(key)
+    if user is not None:
+        return user
+
+    user, expires = verify_locally(token) if uses_local_secret(token) else fetch_remotely(token)
+    if user is None:
+        return None
+
+    ttl = tokenCache.ttl if expires is None else min(tokenCache.ttl, expires - time.time())
+    tokenCache.set(key, user, ttl)
+    return user
+
+def is_supabase_token(authHeader):
+    if not authHeader or not authHeader.startswith("Bearer "):
+        return False
+    try:
+        claims = jwt.decode(authHeader.split(" ")[1], options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return False
+    return claims.get("iss") == SUPABASE_ISSUER
+
+def verify_token(authHeader):
+    if not authHeader or not authHeader.startswith("Bearer "):
+        return None
+    token = authHeader.split(" ")[1]
+    return get_user_info(token)
+
+def auth_stats():
+    return {**tokenCache.stats(), **counters}
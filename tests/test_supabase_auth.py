@@ -0,0 +1,108 @@
+import json, time, threading, uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import jwt, pytest
+from flask import Flask, g
+from flask_jwt_extended import JWTManager
+import auth, supabase_auth
+
+SECRET = "test-supabase-secret-0123456789abcdef"
+USER_ID = str(uuid.uuid4())
+
+class UserInfoStub(BaseHTTPRequestHandler):
+    status = 200
+    requests = []
+
+    def do_GET(self):
+        UserInfoStub.requests.append((self.path, dict(self.headers)))
+        body = json.dumps({"id": USER_ID, "aud": "authenticated", "email": "stub@example.com"}).encode()
+        self.send_response(UserInfoStub.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), UserInfoStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}"
+    monkeypatch.setattr(supabase_auth, "SUPABASE_URL", url)
+    monkeypatch.setattr(supabase_auth, "SUPABASE_ISSUER", f"{url}/auth/v1")
+    monkeypatch.setattr(supabase_auth, "SUPABASE_JWT_SECRET", SECRET)
+    monkeypatch.setattr(supabase_auth, "counters", {name: 0 for name in supabase_auth.counters})
+    monkeypatch.setattr(supabase_auth, "tokenCache", supabase_auth.TTLCache(maxsize=16, ttl=300))
+    UserInfoStub.status = 200
+    UserInfoStub.requests = []
+    yield url
+    server.shutdown()
+    server.server_close()
+
+def make_token(issuer, secret=SECRET, expires_in=600, **claims):
+    payload = {"sub": USER_ID, "aud": "authenticated", "iss": issuer, "exp": int(time.time()) + expires_in, **claims}
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+def test_hs256_token_is_verified_locally_and_cached(stub):
+    token = make_token(f"{stub}/auth/v1")
+
+    assert supabase_auth.verify_token(f"Bearer {token}")["id"] == USER_ID
+    assert supabase_auth.verify_token(f"Bearer {token}")["id"] == USER_ID
+    stats = supabase_auth.auth_stats()
+    assert (stats["local_verified"], stats["remote_calls"], stats["hits"], stats["misses"]) == (1, 0, 1, 1)
+    assert UserInfoStub.requests == []
+
+def test_invalid_local_tokens_are_rejected(stub):
+    issuer = f"{stub}/auth/v1"
+
+    assert supabase_auth.verify_token(f"Bearer {make_token(issuer, expires_in=-10)}") is None
+    assert supabase_auth.verify_token(f"Bearer {make_token(issuer, secret='other-secret-0123456789abcdef0123456789')}") is None
+    assert supabase_auth.verify_token(f"Bearer {make_token(issuer, aud='anon')}") is None
+    assert supabase_auth.auth_stats()["local_rejected"] == 3
+    assert supabase_auth.verify_token("Basic abc") is None
+
+def test_cache_entry_does_not_outlive_token(stub):
+    token = make_token(f"{stub}/auth/v1", expires_in=1)
+
+    assert supabase_auth.verify_token(f"Bearer {token}") is not None
+    time.sleep(1.1)
+    assert supabase_auth.verify_token(f"Bearer {token}") is None
+
+def test_remote_fallback_uses_stub_server(stub, monkeypatch):
+    monkeypatch.setattr(supabase_auth, "SUPABASE_JWT_SECRET", None)
+    token = make_token(f"{stub}/auth/v1", secret="asymmetric-in-production-0123456789abcdef")
+
+    assert supabase_auth.verify_token(f"Bearer {token}")["email"] == "stub@example.com"
+    assert supabase_auth.verify_token(f"Bearer {token}")["id"] == USER_ID
+    assert supabase_auth.auth_stats()["remote_calls"] == 1
+    path, headers = UserInfoStub.requests[0]
+    assert path == "/auth/v1/user"
+    assert headers["Authorization"] == f"Bearer {token}"
+
+def test_remote_rejection_is_not_cached(stub, monkeypatch):
+    monkeypatch.setattr(supabase_auth, "SUPABASE_JWT_SECRET", None)
+    UserInfoStub.status = 401
+    token = make_token(f"{stub}/auth/v1")
+
+    assert supabase_auth.verify_token(f"Bearer {token}") is None
+    assert supabase_auth.verify_token(f"Bearer {token}") is None
+    assert supabase_auth.auth_stats()["remote_failures"] == 2
+
+def test_token_required_accepts_supabase_tokens(stub, monkeypatch):
+    app = Flask(__name__)
+    app.config["JWT_SECRET_KEY"] = "app-secret-0123456789abcdef0123456789"
+    JWTManager(app)
+    monkeypatch.setattr(auth, "userCache", auth.TTLCache(maxsize=16, ttl=10))
+    monkeypatch.setattr(auth, "load_user", lambda user_id: auth.CachedUser([user_id, "stub", "Stub", "#fff", None, 0, 0]) if user_id == USER_ID else None)
+
+    @app.route("/me")
+    @auth.token_required
+    def me():
+        return {"id": g.user.id}
+
+    client = app.test_client()
+    token = make_token(f"{stub}/auth/v1")
+    assert client.get("/me", headers={"Authorization": f"Bearer {token}"}).get_json() == {"id": USER_ID}
+    assert client.get("/me", headers={"Authorization": f"Bearer {make_token(f'{stub}/auth/v1', secret='forged-secret-0123456789abcdef0123456789')}"}).status_code == 401
+    assert client.get("/me", headers={"Authorization": f"Bearer {make_token(f'{stub}/auth/v1', sub=str(uuid.uuid4()))}"}).status_code == 404